@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Understanding Together - Performance benchmarks
+Measures the cold-start cost of the scoring-only path against a time budget, and
+the throughput and latency percentiles of every pipeline stage on a synthetic
+cohort, compared against a stored baseline to flag regressions
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+# Target for a fresh interpreter to import the tool and score one participant
+COLD_START_BUDGET_MS = 250.0
+
+# Modules that the scoring-only path must never import
+HEAVY_MODULES = ("matplotlib", "seaborn", "pandas")
+
+# Pipeline stages timed by run_pipeline_benchmarks(), in report order
+PIPELINE_STAGES = (
+    "catalog_construction", "score_single", "score_batch", "score_batch_lookup", "score_uncertainty",
+    "calculate_risk_level", "generate_recommendations", "generate_report", "save_json", "create_visualization"
+)
+
+# A stage regresses when its median latency grows, or its throughput drops, by more than this
+REGRESSION_TOLERANCE = 0.25
+
+_COLD_START_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from autism_assessment import AutismScreeningTool
+imported = time.perf_counter()
+AutismScreeningTool().score_responses([2] * 21, 48)
+scored = time.perf_counter()
+heavy = sorted({name.split(".")[0] for name in sys.modules} & set(sys.argv[1:]))
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_score_ms": (scored - imported) * 1000,
+    "heavy_modules": heavy,
+}))
+"""
+
+def _summarize(samples: List[float]) -> Dict[str, float]:
+    """Median/min/max of a list of millisecond timings"""
+    return {
+        "median": round(statistics.median(samples), 2),
+        "min": round(min(samples), 2),
+        "max": round(max(samples), 2)
+    }
+
+def measure_cold_start(runs: int = 5) -> Dict[str, Any]:
+    """Time a fresh interpreter importing autism_assessment and scoring one participant"""
+
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [package_dir, os.environ.get("PYTHONPATH")])))
+
+    process_ms, import_ms, first_score_ms = [], [], []
+    heavy_modules = set()
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", _COLD_START_SCRIPT, *HEAVY_MODULES],
+            capture_output=True, text=True, check=True, env=env
+        ).stdout
+        process_ms.append((time.perf_counter() - start) * 1000)
+
+        sample = json.loads(output)
+        import_ms.append(sample["import_ms"])
+        first_score_ms.append(sample["first_score_ms"])
+        heavy_modules.update(sample["heavy_modules"])
+
+    return {
+        "runs": runs,
+        "process_ms": _summarize(process_ms),
+        "import_ms": _summarize(import_ms),
+        "first_score_ms": _summarize(first_score_ms),
+        "heavy_modules": sorted(heavy_modules)
+    }
+
+def _time_calls(function: Callable, arguments: Iterable[tuple]) -> List[float]:
+    """Seconds taken by each call of function(*args)"""
+
+    samples = []
+    for args in arguments:
+        start = time.perf_counter()
+        function(*args)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def _best_of(repeat: int, measure: Callable[[], List[float]]) -> List[float]:
+    """Samples from the repetition with the lowest median, to damp scheduler noise"""
+    return min((measure() for _ in range(max(1, repeat))), key=statistics.median)
+
+def _stage_summary(samples: List[float], items_per_call: int = 1) -> Dict[str, Any]:
+    """Throughput and latency percentiles of one stage"""
+
+    latencies = np.array(samples) * 1000
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+    items = len(samples) * items_per_call
+    return {
+        "calls": len(samples),
+        "items": items,
+        "throughput_per_s": round(items / max(sum(samples), 1e-9), 1),
+        "p50_ms": round(float(p50), 4),
+        "p90_ms": round(float(p90), 4),
+        "p99_ms": round(float(p99), 4),
+        "max_ms": round(float(latencies.max()), 4)
+    }
+
+def run_pipeline_benchmarks(cohort_size: int = 1000, seed: int = 0, batch_size: int = 100,
+                            chart_backend: str = "svg", visualizations: int = 50,
+                            repeat: int = 3) -> Dict[str, Any]:
+    """Time every pipeline stage over a synthetic cohort of cohort_size participants
+
+    Each stage runs ``repeat`` times and the repetition with the lowest median
+    latency is reported.
+    """
+
+    from assessment_cohort import generate_cohort
+    from autism_assessment import AGE_GROUPS, AutismScreeningTool, result_to_dict
+
+    tool = AutismScreeningTool()
+    cohort = generate_cohort(cohort_size, seed, tool=tool)
+    responses, ages = cohort.responses, cohort.age_months
+    rows = responses.tolist()
+    batch = tool.score_batch(responses, ages)
+    results = [tool.build_result(batch, index, f"Benchmark_{index:06d}") for index in range(cohort_size)]
+
+    def timed(function, arguments):
+        arguments = list(arguments)
+        return _best_of(repeat, lambda: _time_calls(function, arguments))
+
+    stages = {}
+    groups = [AGE_GROUPS[index % len(AGE_GROUPS)] for index in range(min(cohort_size, 200))]
+    stages["catalog_construction"] = _stage_summary(
+        timed(tool.build_question_catalog, ((group,) for group in groups))
+    )
+    stages["score_single"] = _stage_summary(
+        timed(tool.score_responses, zip(rows, ages.tolist()))
+    )
+    chunks = [(responses[start:start + batch_size], ages[start:start + batch_size])
+              for start in range(0, cohort_size - batch_size + 1, batch_size)]
+    if chunks:
+        stages["score_batch"] = _stage_summary(timed(tool.score_batch, chunks), batch_size)
+        lookup_tool = AutismScreeningTool(scoring="lookup")
+        stages["score_batch_lookup"] = _stage_summary(timed(lookup_tool.score_batch, chunks), batch_size)
+        stages["score_uncertainty"] = _stage_summary(timed(tool.score_uncertainty, chunks), batch_size)
+    stages["calculate_risk_level"] = _stage_summary(timed(
+        tool.calculate_risk_level, ((result.total_score, result.age_group) for result in results)
+    ))
+    stages["generate_recommendations"] = _stage_summary(timed(
+        tool.generate_recommendations,
+        ((result.scores["social_communication"], result.scores["behavioral_patterns"],
+          result.scores["communication_language"], result.risk_level, result.age_group) for result in results)
+    ))
+    stages["generate_report"] = _stage_summary(
+        timed(tool.generate_report, ((result,) for result in results))
+    )
+
+    def save_json(result, results_dir):
+        with open(f"{results_dir}/{result.participant_id}_results.json", "w") as f:
+            json.dump(result_to_dict(result), f, indent=2)
+
+    with tempfile.TemporaryDirectory() as results_dir:
+        stages["save_json"] = _stage_summary(
+            timed(save_json, ((result, results_dir) for result in results))
+        )
+        if visualizations:
+            stages["create_visualization"] = _stage_summary(timed(
+                tool.create_visualization,
+                ((result, results_dir, chart_backend) for result in results[:visualizations])
+            ))
+
+    return {
+        "cohort_size": cohort_size,
+        "seed": seed,
+        "batch_size": batch_size,
+        "chart_backend": chart_backend,
+        "repeat": repeat,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "stages": stages
+    }
+
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any],
+                        tolerance: float = REGRESSION_TOLERANCE) -> List[str]:
+    """Describe every stage that is slower than the baseline by more than tolerance"""
+
+    regressions = []
+    for stage, current in report["stages"].items():
+        previous = baseline.get("stages", {}).get(stage)
+        if previous is None:
+            continue
+        if current["p50_ms"] > previous["p50_ms"] * (1 + tolerance):
+            regressions.append(f"{stage}: median {current['p50_ms']:.4f} ms "
+                               f"(baseline {previous['p50_ms']:.4f} ms)")
+        if current["throughput_per_s"] < previous["throughput_per_s"] / (1 + tolerance):
+            regressions.append(f"{stage}: {current['throughput_per_s']:.0f}/s "
+                               f"(baseline {previous['throughput_per_s']:.0f}/s)")
+    return regressions
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the benchmarks and fail if the cold start is over budget or a stage regressed"""
+
+    parser = argparse.ArgumentParser(description="Understanding Together - performance benchmarks")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to time")
+    parser.add_argument("--budget-ms", type=float, default=COLD_START_BUDGET_MS,
+                        help="median process time allowed for the scoring-only path")
+    parser.add_argument("--skip-cold-start", action="store_true", help="only run the pipeline stages")
+    parser.add_argument("--skip-pipeline", action="store_true", help="only run the cold-start benchmark")
+    parser.add_argument("--cohort-size", type=int, default=1000, help="synthetic participants per stage")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic cohort")
+    parser.add_argument("--batch-size", type=int, default=100, help="rows per score_batch call")
+    parser.add_argument("--chart-backend", choices=["matplotlib", "svg", "png"], default="svg")
+    parser.add_argument("--visualizations", type=int, default=50,
+                        help="charts to render (0 skips create_visualization)")
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions per stage (best median is kept)")
+    parser.add_argument("--baseline", metavar="PATH", help="earlier --save-baseline report to compare against")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write this run's pipeline report here")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE,
+                        help="allowed slowdown before a stage counts as a regression (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    report = {}
+    if not args.skip_cold_start:
+        report["cold_start"] = measure_cold_start(args.runs)
+    if not args.skip_pipeline:
+        report["pipeline"] = run_pipeline_benchmarks(args.cohort_size, args.seed, args.batch_size,
+                                                     args.chart_backend, args.visualizations, args.repeat)
+    print(json.dumps(report, indent=2))
+
+    failed = False
+    if "cold_start" in report:
+        median = report["cold_start"]["process_ms"]["median"]
+        if report["cold_start"]["heavy_modules"]:
+            print(f"❌ Scoring path imported: {', '.join(report['cold_start']['heavy_modules'])}",
+                  file=sys.stderr)
+            failed = True
+        elif median > args.budget_ms:
+            print(f"❌ Cold start {median:.0f} ms is over the {args.budget_ms:.0f} ms budget",
+                  file=sys.stderr)
+            failed = True
+        else:
+            print(f"✅ Cold start {median:.0f} ms is within the {args.budget_ms:.0f} ms budget",
+                  file=sys.stderr)
+
+    if "pipeline" in report:
+        if args.baseline:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+            if baseline.get("cohort_size") != args.cohort_size:
+                print(f"⚠️  Baseline used a cohort of {baseline.get('cohort_size')}, this run {args.cohort_size}",
+                      file=sys.stderr)
+            regressions = compare_to_baseline(report["pipeline"], baseline, args.tolerance)
+            for regression in regressions:
+                print(f"❌ Regression in {regression}", file=sys.stderr)
+            if regressions:
+                failed = True
+            else:
+                print(f"✅ No stage is more than {args.tolerance:.0%} slower than {args.baseline}",
+                      file=sys.stderr)
+        if args.save_baseline:
+            with open(args.save_baseline, "w") as f:
+                json.dump(report["pipeline"], f, indent=2)
+            print(f"📄 Baseline saved: {args.save_baseline}", file=sys.stderr)
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Understanding Together - Threshold calibration
+ROC sweeps of the total score per age group over a labeled cohort of stored
+results, with suggested risk cutoffs written as a threshold set that
+--thresholds accepts
+
+Every candidate cutoff of a group is evaluated at once: rows are sorted by
+total score and the true/false positive counts at each distinct score are
+read off cumulative sums, so no threshold is ever re-scored.
+"""
+
+import argparse
+import csv
+import json
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from autism_assessment import AGE_GROUPS, RISK_LEVELS, AutismScreeningTool, RiskThresholdTable
+from assessment_query import load_columns, write_rows
+from assessment_store import ResultColumns
+
+# Suggested cutoffs: Low-Moderate keeps this sensitivity (rule-out), High keeps
+# this specificity (rule-in), and Moderate maximises Youden's J (sensitivity +
+# specificity - 1) between the two
+DEFAULT_TARGET_SENSITIVITY = 0.95
+DEFAULT_TARGET_SPECIFICITY = 0.99
+
+# Age groups with fewer labeled cases of either kind fall back to "default"
+DEFAULT_MIN_CASES = 30
+
+LABEL_TRUE = ("1", "true", "yes", "y", "t")
+
+@dataclass
+class RocCurve:
+    """
+    Operating points of "total score >= threshold" as a positive screen
+    One point per distinct total score, thresholds descending
+    """
+    age_group: str
+    thresholds: np.ndarray
+    true_positives: np.ndarray
+    false_positives: np.ndarray
+    positives: int
+    negatives: int
+
+    @property
+    def sensitivity(self) -> np.ndarray:
+        return self.true_positives / max(self.positives, 1)
+
+    @property
+    def specificity(self) -> np.ndarray:
+        return 1 - self.false_positives / max(self.negatives, 1)
+
+    def auc(self) -> float:
+        """Area under the curve (trapezoidal, from the all-negative corner)"""
+        fpr = np.concatenate(([0.0], 1 - self.specificity))
+        tpr = np.concatenate(([0.0], self.sensitivity))
+        return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+
+    def suggest_cutoffs(self, target_sensitivity: float = DEFAULT_TARGET_SENSITIVITY,
+                        target_specificity: float = DEFAULT_TARGET_SPECIFICITY) -> List[float]:
+        """Low-Moderate, Moderate and High cutoffs, ascending but equal where the targets leave no room"""
+
+        sensitivity, specificity = self.sensitivity, self.specificity
+        # Sensitivity rises and specificity falls as the threshold drops
+        sensitive = np.flatnonzero(sensitivity >= target_sensitivity)
+        specific = np.flatnonzero(specificity >= target_specificity)
+        low_moderate = sensitive[0] if len(sensitive) else len(self.thresholds) - 1
+        high = min(specific[-1] if len(specific) else 0, low_moderate)
+        # Indexes run from high thresholds to low ones
+        between = np.arange(high + 1, low_moderate)
+        moderate = (between[np.argmax(sensitivity[between] + specificity[between])] if len(between)
+                    else low_moderate)
+        return [round(float(self.thresholds[index]), 2) for index in (low_moderate, moderate, high)]
+
+    def at(self, cutoff: float) -> Tuple[float, float]:
+        """Sensitivity and specificity when screening positive at ``cutoff`` and above"""
+
+        index = np.searchsorted(-self.thresholds, -cutoff, side="right") - 1
+        if index < 0:
+            return 0.0, 1.0
+        return float(self.sensitivity[index]), float(self.specificity[index])
+
+def roc_curves(total_scores: np.ndarray, labels: np.ndarray,
+               age_group_codes: np.ndarray) -> Dict[str, RocCurve]:
+    """ROC curve for every age group present, plus "default" over all rows
+
+    Scores are compared at report precision (2 dp). One sort serves every
+    group: a group's rows keep their score order within the sorted whole.
+    """
+
+    scores = np.round(np.asarray(total_scores, dtype=np.float64), 2)
+    labels = np.asarray(labels, dtype=bool)
+    age_group_codes = np.asarray(age_group_codes)
+
+    order = np.argsort(-scores, kind="stable")
+    scores, labels, age_group_codes = scores[order], labels[order], age_group_codes[order]
+
+    curves = {"default": _curve("default", scores, labels)}
+    for code in np.unique(age_group_codes):
+        mask = age_group_codes == code
+        curves[AGE_GROUPS[code]] = _curve(AGE_GROUPS[code], scores[mask], labels[mask])
+    return curves
+
+def _curve(age_group: str, scores: np.ndarray, labels: np.ndarray) -> RocCurve:
+    """Cumulative counts at the last row of each run of equal scores (scores descending)"""
+
+    true_positives = np.cumsum(labels)
+    false_positives = np.arange(1, len(labels) + 1) - true_positives
+    ends = np.flatnonzero(np.append(scores[1:] != scores[:-1], True)) if len(scores) else np.zeros(0, dtype=int)
+    return RocCurve(
+        age_group=age_group,
+        thresholds=scores[ends],
+        true_positives=true_positives[ends],
+        false_positives=false_positives[ends],
+        positives=int(true_positives[-1]) if len(labels) else 0,
+        negatives=int(false_positives[-1]) if len(labels) else 0
+    )
+
+def calibrate(curves: Mapping[str, RocCurve], base: Optional[RiskThresholdTable] = None,
+              target_sensitivity: float = DEFAULT_TARGET_SENSITIVITY,
+              target_specificity: float = DEFAULT_TARGET_SPECIFICITY,
+              min_cases: int = DEFAULT_MIN_CASES) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Suggested threshold set (RiskThresholdTable format) and one summary row per curve
+
+    Confidence values are carried over from ``base``. Groups with fewer than
+    ``min_cases`` positives or negatives, or whose suggested cutoffs are not
+    strictly increasing, get no entry of their own; the row's note says why.
+    """
+
+    base = base or RiskThresholdTable()
+    thresholds, rows = {}, []
+    for age_group, curve in curves.items():
+        group = age_group if age_group in base.cutoffs else "default"
+        current = base.cutoffs[group].tolist()
+        row = {"age_group": age_group, "positives": curve.positives, "negatives": curve.negatives,
+               "auc": round(curve.auc(), 4) if curve.positives and curve.negatives else None,
+               "current_cutoffs": current}
+        cutoffs, note = None, ""
+        if min(curve.positives, curve.negatives) < min_cases:
+            note = "too few labeled cases"
+        else:
+            cutoffs = curve.suggest_cutoffs(target_sensitivity, target_specificity)
+            if cutoffs[0] < cutoffs[1] < cutoffs[2]:
+                thresholds[age_group] = {"cutoffs": cutoffs, "confidence": base.confidence[group].tolist()}
+            else:
+                # Equal cutoffs would silently drop the Low-Moderate or Moderate band
+                note = "cutoffs not strictly increasing (targets too close); not written"
+        row["suggested_cutoffs"] = cutoffs
+        for index, level in enumerate(RISK_LEVELS[1:]):
+            sensitivity, specificity = curve.at(cutoffs[index]) if cutoffs else (None, None)
+            key = level.lower().replace("-", "_")
+            row[f"{key}_sensitivity"] = None if sensitivity is None else round(sensitivity, 3)
+            row[f"{key}_specificity"] = None if specificity is None else round(specificity, 3)
+        row["note"] = note
+        rows.append(row)
+    return thresholds, rows
+
+def read_labels(path: str, field: str = "autistic") -> Dict[str, bool]:
+    """participant_id -> label from a JSONL or CSV file (e.g. a cohort written with labels)"""
+
+    labels = {}
+    with open(path, newline="") as f:
+        records = csv.DictReader(f) if path.lower().endswith(".csv") else (
+            json.loads(line) for line in f if line.strip()
+        )
+        for record in records:
+            value = record[field]
+            labels[str(record["participant_id"])] = (
+                value if isinstance(value, bool) else str(value).strip().lower() in LABEL_TRUE
+            )
+    return labels
+
+def join_labels(columns: ResultColumns, labels: Mapping[str, bool]) -> Tuple[np.ndarray, np.ndarray]:
+    """Row mask of stored results that have a label, and the label of each such row"""
+
+    if not labels:
+        return np.zeros(len(columns), dtype=bool), np.zeros(0, dtype=bool)
+    stored = columns.column("participant_id")
+    ids = np.array([participant_id.encode("utf-8") for participant_id in labels])
+    # Compare at the wider of the two widths so no ID is truncated into a false match
+    width = max(ids.itemsize, stored.itemsize)
+    ids, stored = ids.astype(f"S{width}"), stored.astype(f"S{width}", copy=False)
+    values = np.fromiter(labels.values(), dtype=bool, count=len(labels))
+    order = np.argsort(ids)
+    ids, values = ids[order], values[order]
+
+    positions = np.minimum(np.searchsorted(ids, stored), len(ids) - 1)
+    found = ids[positions] == stored
+    return found, values[positions[found]]
+
+def synthetic_sample(size: int, seed: int = 0,
+                     tool: Optional[AutismScreeningTool] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Total scores, labels and age-group codes for a freshly scored synthetic cohort"""
+
+    from assessment_cohort import iter_cohort
+
+    tool = tool or AutismScreeningTool()
+    scores, labels, groups = [], [], []
+    for chunk in iter_cohort(size, seed, tool=tool):
+        batch = tool.score_batch(chunk.responses, chunk.age_months)
+        scores.append(batch.total)
+        labels.append(chunk.autistic)
+        groups.append(tool.age_group_codes(chunk.age_months))
+    return np.concatenate(scores), np.concatenate(labels), np.concatenate(groups)
+
+def write_curves(curves: Mapping[str, RocCurve], path: str):
+    """Every operating point of every curve as CSV"""
+
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["age_group", "threshold", "sensitivity", "specificity",
+                         "true_positives", "false_positives"])
+        for age_group, curve in curves.items():
+            for row in zip(curve.thresholds.tolist(), curve.sensitivity.round(6).tolist(),
+                           curve.specificity.round(6).tolist(), curve.true_positives.tolist(),
+                           curve.false_positives.tolist()):
+                writer.writerow([age_group, *row])
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Calibrate risk cutoffs against labeled results"""
+
+    parser = argparse.ArgumentParser(description="Understanding Together - threshold calibration")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--database", help="SQLite results database")
+    source.add_argument("--columns", help=".npy file written by ResultColumns.save()")
+    source.add_argument("--results-dir", help="directory of saved result files (flat or sharded)")
+    source.add_argument("--synthetic", type=int, metavar="SIZE",
+                        help="score a labeled synthetic cohort of SIZE participants instead")
+    parser.add_argument("--labels", metavar="PATH",
+                        help="JSONL or CSV with participant_id and a label column (required for stored results)")
+    parser.add_argument("--label-field", default="autistic", help="label column in --labels")
+    parser.add_argument("--seed", type=int, default=0, help="with --synthetic: cohort seed")
+    parser.add_argument("--thresholds", metavar="CONFIG",
+                        help="current threshold set (JSON or TOML) to compare with and take confidences from")
+    parser.add_argument("--sensitivity", type=float, default=DEFAULT_TARGET_SENSITIVITY,
+                        help="sensitivity kept by the Low-Moderate cutoff")
+    parser.add_argument("--specificity", type=float, default=DEFAULT_TARGET_SPECIFICITY,
+                        help="specificity kept by the High cutoff")
+    parser.add_argument("--min-cases", type=int, default=DEFAULT_MIN_CASES,
+                        help="fewest positives and negatives for an age group to get its own cutoffs")
+    parser.add_argument("--output", metavar="PATH", help="write the suggested threshold set (JSON) here")
+    parser.add_argument("--curves", metavar="PATH", help="write every ROC operating point (CSV) here")
+    parser.add_argument("--format", choices=["table", "json", "csv"], default="table")
+    args = parser.parse_args(argv)
+
+    base = RiskThresholdTable.from_file(args.thresholds) if args.thresholds else RiskThresholdTable()
+    if args.synthetic is not None:
+        scores, labels, groups = synthetic_sample(args.synthetic, args.seed, AutismScreeningTool(base))
+    else:
+        if not args.labels:
+            parser.error("--labels is required with stored results")
+        columns = load_columns(args.database, args.results_dir, args.columns)
+        found, labels = join_labels(columns, read_labels(args.labels, args.label_field))
+        print(f"🔗 Matched {int(found.sum())} of {len(columns)} stored results to labels", file=sys.stderr)
+        scores, groups = columns.column("total_score")[found], columns.column("age_group")[found]
+
+    curves = roc_curves(scores, labels, groups)
+    thresholds, rows = calibrate(curves, base, args.sensitivity, args.specificity, args.min_cases)
+    if "default" not in thresholds:
+        note = next(row["note"] for row in rows if row["age_group"] == "default")
+        print(f"❌ Cannot calibrate the default cutoffs: {note}", file=sys.stderr)
+        return 1
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(thresholds, f, indent=2)
+            f.write("\n")
+        print(f"📄 Wrote suggested thresholds to {args.output} (use with --thresholds)", file=sys.stderr)
+    if args.curves:
+        write_curves(curves, args.curves)
+    if args.format == "table":
+        for row in rows:
+            for key in ("current_cutoffs", "suggested_cutoffs"):
+                row[key] = "-" if row[key] is None else "/".join(f"{cutoff:g}" for cutoff in row[key])
+    write_rows(rows, args.format)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
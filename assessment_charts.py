@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Understanding Together - Lightweight chart renderer
+Draws the four-panel assessment chart directly as SVG, or as a small PNG through
+a minimal built-in rasterizer, without importing matplotlib
+
+The matplotlib renderer in AutismScreeningTool.create_visualization remains the
+high-fidelity option; this module trades anti-aliasing and fonts for speed.
+"""
+
+import math
+import struct
+import zlib
+from typing import List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+# Logical canvas (matches the 15x12 inch matplotlib figure at 100 px/inch)
+CANVAS_WIDTH = 1500
+CANVAS_HEIGHT = 1200
+
+BACKGROUND = "#0a0e27"
+TEXT_COLOR = "#ffffff"
+DOMAIN_COLORS = ("#667eea", "#f093fb", "#f5576c")
+RISK_LEVELS = ("Low", "Low-Moderate", "Moderate", "High")
+RISK_COLORS = ("#4CAF50", "#FFC107", "#FF9800", "#F44336")
+
+# 5x7 bitmap font for the rasterizer (one 5-bit row per entry, lowercase drawn as uppercase)
+FONT_5X7 = {
+    "0": (0x0E, 0x11, 0x13, 0x15, 0x19, 0x11, 0x0E), "1": (0x04, 0x0C, 0x04, 0x04, 0x04, 0x04, 0x0E),
+    "2": (0x0E, 0x11, 0x01, 0x02, 0x04, 0x08, 0x1F), "3": (0x1F, 0x02, 0x04, 0x02, 0x01, 0x11, 0x0E),
+    "4": (0x02, 0x06, 0x0A, 0x12, 0x1F, 0x02, 0x02), "5": (0x1F, 0x10, 0x1E, 0x01, 0x01, 0x11, 0x0E),
+    "6": (0x06, 0x08, 0x10, 0x1E, 0x11, 0x11, 0x0E), "7": (0x1F, 0x01, 0x02, 0x04, 0x08, 0x08, 0x08),
+    "8": (0x0E, 0x11, 0x11, 0x0E, 0x11, 0x11, 0x0E), "9": (0x0E, 0x11, 0x11, 0x0F, 0x01, 0x02, 0x0C),
+    "A": (0x0E, 0x11, 0x11, 0x11, 0x1F, 0x11, 0x11), "B": (0x1E, 0x11, 0x11, 0x1E, 0x11, 0x11, 0x1E),
+    "C": (0x0E, 0x11, 0x10, 0x10, 0x10, 0x11, 0x0E), "D": (0x1C, 0x12, 0x11, 0x11, 0x11, 0x12, 0x1C),
+    "E": (0x1F, 0x10, 0x10, 0x1E, 0x10, 0x10, 0x1F), "F": (0x1F, 0x10, 0x10, 0x1E, 0x10, 0x10, 0x10),
+    "G": (0x0E, 0x11, 0x10, 0x17, 0x11, 0x11, 0x0F), "H": (0x11, 0x11, 0x11, 0x1F, 0x11, 0x11, 0x11),
+    "I": (0x0E, 0x04, 0x04, 0x04, 0x04, 0x04, 0x0E), "J": (0x07, 0x02, 0x02, 0x02, 0x02, 0x12, 0x0C),
+    "K": (0x11, 0x12, 0x14, 0x18, 0x14, 0x12, 0x11), "L": (0x10, 0x10, 0x10, 0x10, 0x10, 0x10, 0x1F),
+    "M": (0x11, 0x1B, 0x15, 0x15, 0x11, 0x11, 0x11), "N": (0x11, 0x11, 0x19, 0x15, 0x13, 0x11, 0x11),
+    "O": (0x0E, 0x11, 0x11, 0x11, 0x11, 0x11, 0x0E), "P": (0x1E, 0x11, 0x11, 0x1E, 0x10, 0x10, 0x10),
+    "Q": (0x0E, 0x11, 0x11, 0x11, 0x15, 0x12, 0x0D), "R": (0x1E, 0x11, 0x11, 0x1E, 0x14, 0x12, 0x11),
+    "S": (0x0F, 0x10, 0x10, 0x0E, 0x01, 0x01, 0x1E), "T": (0x1F, 0x04, 0x04, 0x04, 0x04, 0x04, 0x04),
+    "U": (0x11, 0x11, 0x11, 0x11, 0x11, 0x11, 0x0E), "V": (0x11, 0x11, 0x11, 0x11, 0x11, 0x0A, 0x04),
+    "W": (0x11, 0x11, 0x11, 0x15, 0x15, 0x15, 0x0A), "X": (0x11, 0x11, 0x0A, 0x04, 0x0A, 0x11, 0x11),
+    "Y": (0x11, 0x11, 0x11, 0x0A, 0x04, 0x04, 0x04), "Z": (0x1F, 0x01, 0x02, 0x04, 0x08, 0x10, 0x1F),
+    " ": (0x00,) * 7, ".": (0x00, 0x00, 0x00, 0x00, 0x00, 0x0C, 0x0C),
+    ",": (0x00, 0x00, 0x00, 0x00, 0x0C, 0x04, 0x08), ":": (0x00, 0x0C, 0x0C, 0x00, 0x0C, 0x0C, 0x00),
+    "%": (0x18, 0x19, 0x02, 0x04, 0x08, 0x13, 0x03), "/": (0x00, 0x01, 0x02, 0x04, 0x08, 0x10, 0x00),
+    "-": (0x00, 0x00, 0x00, 0x1F, 0x00, 0x00, 0x00), "&": (0x0C, 0x12, 0x14, 0x08, 0x15, 0x12, 0x0D),
+    "(": (0x02, 0x04, 0x08, 0x08, 0x08, 0x04, 0x02), ")": (0x08, 0x04, 0x02, 0x02, 0x02, 0x04, 0x08),
+    "'": (0x0C, 0x04, 0x08, 0x00, 0x00, 0x00, 0x00), "?": (0x0E, 0x11, 0x01, 0x02, 0x04, 0x00, 0x04),
+    "+": (0x00, 0x04, 0x04, 0x1F, 0x04, 0x04, 0x00), "•": (0x00, 0x00, 0x0E, 0x0E, 0x0E, 0x00, 0x00),
+    "_": (0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x1F),
+}
+
+def _hex_to_rgb(color: str) -> Tuple[int, int, int]:
+    """Convert a #rrggbb color to an RGB tuple"""
+    color = color.lstrip("#")
+    return int(color[0:2], 16), int(color[2:4], 16), int(color[4:6], 16)
+
+def _wrap(text: str, width: int) -> List[str]:
+    """Greedy word wrap used by the recommendations panel"""
+    lines, line = [], ""
+    for word in text.split():
+        if line and len(line) + 1 + len(word) > width:
+            lines.append(line)
+            line = "  " + word
+        else:
+            line = f"{line} {word}" if line else word
+    if line:
+        lines.append(line)
+    return lines
+
+class SvgPainter:
+    """Collects drawing operations as SVG elements"""
+
+    def __init__(self, width: int = CANVAS_WIDTH, height: int = CANVAS_HEIGHT):
+        self.width = width
+        self.height = height
+        self.elements = []
+
+    def rect(self, x: float, y: float, w: float, h: float, color: str, opacity: float = 1.0):
+        self.elements.append(
+            f'<rect x="{x:.1f}" y="{y:.1f}" width="{w:.1f}" height="{h:.1f}" '
+            f'fill="{color}" fill-opacity="{opacity}"/>'
+        )
+
+    def wedge(self, cx: float, cy: float, r: float, start: float, end: float, color: str):
+        """Pie wedge drawn clockwise from angle ``start`` to ``end`` (degrees, counterclockwise from +x)"""
+        x1, y1 = cx + r * math.cos(math.radians(start)), cy - r * math.sin(math.radians(start))
+        x2, y2 = cx + r * math.cos(math.radians(end)), cy - r * math.sin(math.radians(end))
+        large_arc = 1 if abs(start - end) > 180 else 0
+        self.elements.append(
+            f'<path d="M{cx:.1f},{cy:.1f} L{x1:.1f},{y1:.1f} A{r:.1f},{r:.1f} 0 {large_arc} 1 '
+            f'{x2:.1f},{y2:.1f} Z" fill="{color}"/>'
+        )
+
+    def text(self, x: float, y: float, text: str, size: float, color: str = TEXT_COLOR,
+             anchor: str = "middle", bold: bool = False):
+        weight = ' font-weight="bold"' if bold else ""
+        self.elements.append(
+            f'<text x="{x:.1f}" y="{y:.1f}" font-size="{size}" fill="{color}" text-anchor="{anchor}" '
+            f'dominant-baseline="middle"{weight}>{escape(text)}</text>'
+        )
+
+    def render(self) -> str:
+        return "\n".join([
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.width}" height="{self.height}" '
+            f'viewBox="0 0 {CANVAS_WIDTH} {CANVAS_HEIGHT}" font-family="DejaVu Sans, Arial, sans-serif">',
+            f'<rect width="100%" height="100%" fill="{BACKGROUND}"/>',
+            *self.elements,
+            "</svg>",
+            ""
+        ])
+
+class RasterPainter:
+    """Minimal RGB rasterizer (no anti-aliasing) that encodes to PNG"""
+
+    def __init__(self, width: int = CANVAS_WIDTH // 2, height: int = CANVAS_HEIGHT // 2):
+        self.width = width
+        self.height = height
+        self.scale = width / CANVAS_WIDTH
+        self.pixels = bytearray(bytes(_hex_to_rgb(BACKGROUND)) * (width * height))
+
+    def _fill(self, x0: int, y0: int, x1: int, y1: int, rgb: Tuple[int, int, int]):
+        """Fill the device-pixel box [x0, x1) x [y0, y1)"""
+        x0, x1 = max(0, x0), min(self.width, x1)
+        y0, y1 = max(0, y0), min(self.height, y1)
+        if x0 >= x1:
+            return
+        span = bytes(rgb) * (x1 - x0)
+        for y in range(y0, y1):
+            offset = (y * self.width + x0) * 3
+            self.pixels[offset:offset + len(span)] = span
+
+    def rect(self, x: float, y: float, w: float, h: float, color: str, opacity: float = 1.0):
+        s = self.scale
+        x0, y0 = round(x * s), round(y * s)
+        x1, y1 = max(x0 + 1, round((x + w) * s)), max(y0 + 1, round((y + h) * s))
+        rgb = _hex_to_rgb(color)
+        if opacity >= 1.0:
+            self._fill(x0, y0, x1, y1, rgb)
+            return
+
+        # Blend against whatever is already drawn, one run of identical pixels at a time
+        x0, x1 = max(0, x0), min(self.width, x1)
+        blended = {}
+        for py in range(max(0, y0), min(self.height, y1)):
+            offset = (py * self.width + x0) * 3
+            segment = self.pixels[offset:offset + (x1 - x0) * 3]
+            for px in range(0, len(segment), 3):
+                old = bytes(segment[px:px + 3])
+                if old not in blended:
+                    blended[old] = bytes(round(o + (c - o) * opacity) for o, c in zip(old, rgb))
+                segment[px:px + 3] = blended[old]
+            self.pixels[offset:offset + len(segment)] = segment
+
+    def wedge(self, cx: float, cy: float, r: float, start: float, end: float, color: str):
+        s = self.scale
+        cx, cy, r = cx * s, cy * s, r * s
+        rgb = bytes(_hex_to_rgb(color))
+        low, high = min(start, end), max(start, end)
+        for py in range(max(0, int(cy - r)), min(self.height, int(cy + r) + 1)):
+            dy = cy - py - 0.5
+            for px in range(max(0, int(cx - r)), min(self.width, int(cx + r) + 1)):
+                dx = px + 0.5 - cx
+                if dx * dx + dy * dy > r * r:
+                    continue
+                angle = math.degrees(math.atan2(dy, dx))
+                # Bring the angle into the wedge's range before testing
+                while angle < low:
+                    angle += 360
+                while angle > high and angle - 360 >= low:
+                    angle -= 360
+                if low <= angle <= high:
+                    offset = (py * self.width + px) * 3
+                    self.pixels[offset:offset + 3] = rgb
+
+    def text(self, x: float, y: float, text: str, size: float, color: str = TEXT_COLOR,
+             anchor: str = "middle", bold: bool = False):
+        s = self.scale
+        dot = max(1, round(size * s / 8))
+        advance = 6 * dot
+        width = advance * len(text)
+        left = round(x * s) - {"middle": width // 2, "end": width}.get(anchor, 0)
+        top = round(y * s) - (7 * dot) // 2
+        rgb = _hex_to_rgb(color)
+
+        for i, char in enumerate(text.upper()):
+            glyph = FONT_5X7.get(char, FONT_5X7["?"])
+            gx = left + i * advance
+            for row, bits in enumerate(glyph):
+                for col in range(5):
+                    if bits & (0x10 >> col):
+                        px, py = gx + col * dot, top + row * dot
+                        self._fill(px, py, px + dot + (1 if bold else 0), py + dot, rgb)
+
+    def render(self) -> bytes:
+        """Encode the canvas as an 8-bit RGB PNG"""
+        stride = self.width * 3
+        raw = b"".join(
+            b"\x00" + bytes(self.pixels[y * stride:(y + 1) * stride]) for y in range(self.height)
+        )
+
+        def chunk(kind: bytes, data: bytes) -> bytes:
+            return (struct.pack(">I", len(data)) + kind + data
+                    + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+        header = struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0)
+        return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+                + chunk(b"IDAT", zlib.compress(raw, 6)) + chunk(b"IEND", b""))
+
+def draw_panels(painter, result):
+    """Lay out the same four panels as the matplotlib chart on ``painter``"""
+
+    painter.text(CANVAS_WIDTH / 2, 40, "Understanding Together - Assessment Results", 26)
+    painter.text(CANVAS_WIDTH / 2, 76, result.participant_id, 26)
+
+    # 1. Domain Scores Bar Chart
+    left, right, top, bottom = 140, 700, 190, 520
+    painter.text((left + right) / 2, 140, "Domain Scores", 20)
+    for tick in range(5):
+        y = bottom - (bottom - top) * tick / 4
+        painter.rect(left, y, right - left, 1.5, "#ffffff", 0.3)
+        painter.text(left - 15, y, f"{tick}", 14, anchor="end")
+    painter.text(left - 80, (top + bottom) / 2, "Score", 16)
+
+    domains = (("Social", "Communication"), ("Behavioral", "Patterns"), ("Communication", "& Language"))
+    scores = (result.scores["social_communication"],
+              result.scores["behavioral_patterns"],
+              result.scores["communication_language"])
+    slot = (right - left) / len(scores)
+    for i, (labels, score, color) in enumerate(zip(domains, scores, DOMAIN_COLORS)):
+        height = (bottom - top) * min(max(score, 0), 4) / 4
+        x = left + slot * i + slot * 0.1
+        painter.rect(x, bottom - height, slot * 0.8, height, color, 0.8)
+        painter.text(x + slot * 0.4, bottom - height - 16, f"{score:.1f}", 16)
+        for line, label in enumerate(labels):
+            painter.text(x + slot * 0.4, bottom + 24 + line * 22, label, 14)
+
+    # 2. Risk Level Indicator (Gauge-style)
+    cx, cy, r = 1110, 360, 170
+    painter.text(cx, 140, f"Risk Level: {result.risk_level}", 20)
+    current = RISK_LEVELS.index(result.risk_level) if result.risk_level in RISK_LEVELS else -1
+    for i, (label, color) in enumerate(zip(RISK_LEVELS, RISK_COLORS)):
+        start, end = 90 - 90 * i, 90 - 90 * (i + 1)
+        middle = math.radians((start + end) / 2)
+        shift = 0.1 * r if i == current else 0
+        wx, wy = cx + shift * math.cos(middle), cy - shift * math.sin(middle)
+        painter.wedge(wx, wy, r, start, end, color)
+        painter.text(wx + 1.25 * r * math.cos(middle), wy - 1.25 * r * math.sin(middle), label, 15)
+
+    # 3. Confidence and Total Score
+    painter.text(390, 790, "Total Score", 24)
+    painter.text(390, 890, f"{result.total_score:.2f}/4.0", 40, color=DOMAIN_COLORS[0], bold=True)
+    painter.text(390, 990, f"Confidence: {result.confidence}%", 22)
+
+    # 4. Recommendations Summary
+    painter.text(1110, 690, "Key Recommendations", 22, bold=True)
+    lines = []
+    for recommendation in result.recommendations[:4]:
+        lines.extend(_wrap(f"• {recommendation}", 52))
+    if len(result.recommendations) > 4:
+        lines.append(f"... and {len(result.recommendations) - 4} more")
+    for i, line in enumerate(lines):
+        painter.text(800, 740 + i * 30, line, 16, anchor="start")
+
+def render_svg(result) -> str:
+    """Render an AssessmentResult as an SVG document"""
+    painter = SvgPainter()
+    draw_panels(painter, result)
+    return painter.render()
+
+def render_png(result, width: int = CANVAS_WIDTH // 2) -> bytes:
+    """Render an AssessmentResult as PNG bytes with the built-in rasterizer"""
+    painter = RasterPainter(width, round(width * CANVAS_HEIGHT / CANVAS_WIDTH))
+    draw_panels(painter, result)
+    return painter.render()
+
+def save_chart(result, results_dir: str, fmt: str = "svg", stem: Optional[str] = None) -> str:
+    """Write the chart for ``result`` into results_dir and return its filename"""
+
+    stem = stem or result.participant_id
+    if fmt == "svg":
+        filename = f"{results_dir}/{stem}_visualization.svg"
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(render_svg(result))
+    elif fmt == "png":
+        filename = f"{results_dir}/{stem}_visualization.png"
+        with open(filename, "wb") as f:
+            f.write(render_png(result))
+    else:
+        raise ValueError(f"Unsupported chart format: {fmt}")
+    return filename
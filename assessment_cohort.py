@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Understanding Together - Synthetic cohorts and load testing
+Seeded generator for arbitrarily large synthetic cohorts (realistic age mix,
+correlated per-domain response patterns) and a driver that feeds them through
+scoring, persistence and rendering at a target rate
+
+No real participant data is involved; every record is simulated.
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+import assessment_metrics
+from autism_assessment import DOMAINS, RESULT_LAYOUTS, AutismScreeningTool
+
+# Share of each age group among people referred for screening, with the
+# age range (months) drawn from uniformly inside the group
+AGE_MIX = {
+    "toddler": (0.35, 16, 30),
+    "kid": (0.30, 31, 72),
+    "teenager": (0.20, 73, 215),
+    "young": (0.10, 216, 359),
+    "senior": (0.05, 360, 900)
+}
+
+# Latent trait model: autistic participants (share = prevalence) have a higher
+# general trait level; each domain mixes that level with its own component
+DEFAULT_PREVALENCE = 0.15
+DEFAULT_DOMAIN_CORRELATION = 0.7
+TRAIT_MEANS = (-0.8, 1.6)      # (non-autistic, autistic)
+TRAIT_SPREADS = (0.6, 0.5)
+ITEM_BASELINE = 1.5            # concern rating at a trait level of 0
+ITEM_LOADING = 1.2
+ITEM_NOISE = 0.7
+
+@dataclass
+class SyntheticCohort:
+    """A block of simulated participants; responses follow indicator_order"""
+    participant_ids: List[str]
+    age_months: np.ndarray
+    responses: np.ndarray
+    autistic: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.participant_ids)
+
+    def records(self, labels: bool = False) -> Iterator[Dict[str, Any]]:
+        """Batch-input records (as read by read_response_records) for each participant
+        
+        With ``labels`` each record also carries its simulated "autistic" label,
+        which scoring ignores and threshold calibration reads.
+        """
+        for participant_id, age, row, autistic in zip(self.participant_ids, self.age_months.tolist(),
+                                                      self.responses.tolist(), self.autistic.tolist()):
+            record = {"participant_id": participant_id, "age_months": age, "responses": row}
+            if labels:
+                record["autistic"] = autistic
+            yield record
+
+def generate_cohort(size: int, seed: int = 0, prevalence: float = DEFAULT_PREVALENCE,
+                    domain_correlation: float = DEFAULT_DOMAIN_CORRELATION,
+                    age_mix: Optional[Mapping[str, Sequence[float]]] = None,
+                    tool: Optional[AutismScreeningTool] = None, first_index: int = 0,
+                    rng: Optional[np.random.Generator] = None) -> SyntheticCohort:
+    """Simulate ``size`` participants, reproducibly for a given seed"""
+
+    if not 0 <= prevalence <= 1:
+        raise ValueError("prevalence must be between 0 and 1")
+    if not 0 <= domain_correlation <= 1:
+        raise ValueError("domain_correlation must be between 0 and 1")
+    tool = tool or AutismScreeningTool()
+    rng = rng or np.random.default_rng(seed)
+    age_mix = age_mix or AGE_MIX
+
+    # Ages: pick a group by its share, then a month inside its range
+    shares = np.array([share for share, _, _ in age_mix.values()], dtype=float)
+    lows = np.array([low for _, low, _ in age_mix.values()])
+    highs = np.array([high for _, _, high in age_mix.values()])
+    groups = rng.choice(len(shares), size, p=shares / shares.sum())
+    ages = rng.integers(lows[groups], highs[groups] + 1)
+
+    # General trait level, then one correlated level per domain
+    autistic = rng.random(size) < prevalence
+    trait = rng.normal(np.where(autistic, TRAIT_MEANS[1], TRAIT_MEANS[0]),
+                       np.where(autistic, TRAIT_SPREADS[1], TRAIT_SPREADS[0]))
+    domain_levels = (domain_correlation * trait[:, None]
+                     + np.sqrt(1 - domain_correlation ** 2) * rng.normal(0, 0.6, (size, len(DOMAINS))))
+
+    # Per-item concern ratings; reverse-scored items are answered the other way round
+    item_levels = np.empty((size, len(tool.indicator_order)))
+    for column, method_key in enumerate(DOMAINS):
+        item_levels[:, tool.domain_slices[method_key]] = domain_levels[:, [column]]
+    concern = np.clip(np.rint(ITEM_BASELINE + ITEM_LOADING * item_levels
+                              + rng.normal(0, ITEM_NOISE, item_levels.shape)), 0, 4).astype(np.int8)
+    responses = np.where(tool.reverse_mask, 4 - concern, concern).astype(np.int8)
+
+    return SyntheticCohort(
+        participant_ids=[f"Synthetic_{seed}_{index:08d}" 
+                         for index in range(first_index, first_index + size)],
+        age_months=ages,
+        responses=responses,
+        autistic=autistic
+    )
+
+def iter_cohort(size: int, seed: int = 0, chunk_size: int = 100_000,
+                **options: Any) -> Iterator[SyntheticCohort]:
+    """Generate a cohort in chunks so any size fits in memory (reproducible per seed and chunk_size)"""
+
+    tool = options.pop("tool", None) or AutismScreeningTool()
+    for index, start in enumerate(range(0, size, chunk_size)):
+        yield generate_cohort(min(chunk_size, size - start), seed, tool=tool, first_index=start,
+                              rng=np.random.default_rng([seed, index]), **options)
+
+def write_cohort(path: str, size: int, seed: int = 0, labels: bool = False, **options: Any) -> int:
+    """Write a synthetic cohort as JSONL or CSV (by extension) for --batch runs"""
+
+    tool = options.pop("tool", None) or AutismScreeningTool()
+    count = 0
+    with open(path, "w", newline="") as f:
+        writer = None
+        if path.lower().endswith(".csv"):
+            writer = csv.writer(f)
+            writer.writerow(["participant_id", "age_months", *tool.indicator_order,
+                             *(["autistic"] if labels else [])])
+        for chunk in iter_cohort(size, seed, tool=tool, **options):
+            for record in chunk.records(labels):
+                if writer is not None:
+                    writer.writerow([record["participant_id"], record["age_months"], *record["responses"],
+                                     *([int(record["autistic"])] if labels else [])])
+                else:
+                    f.write(json.dumps(record))
+                    f.write("\n")
+            count += len(chunk)
+    return count
+
+def _latency_summary(seconds: List[float]) -> Dict[str, float]:
+    if not seconds:
+        return {}
+    p50, p95, p99 = np.percentile(np.array(seconds) * 1000, [50, 95, 99])
+    return {"p50_ms": round(float(p50), 3), "p95_ms": round(float(p95), 3), "p99_ms": round(float(p99), 3),
+            "max_ms": round(max(seconds) * 1000, 3)}
+
+def run_load_test(size: int = 10_000, rate: float = 0.0, seed: int = 0, batch_size: int = 100,
+                  render_reports: bool = True, persist: str = "none",
+                  results_dir: str = "assessment_results", layout: str = "flat",
+                  database_path: str = "assessment_results/assessments.db",
+                  chart_backend: Optional[str] = None, tool: Optional[AutismScreeningTool] = None,
+                  **options: Any) -> Dict[str, Any]:
+    """Feed a synthetic cohort through the pipeline at ``rate`` participants per second
+
+    Each batch of ``batch_size`` participants is scored, optionally rendered
+    as text reports, and persisted to result files (``persist="files"``,
+    through the background writer, with charts when ``chart_backend`` is set)
+    or to the results database (``persist="database"``). A rate of 0 runs
+    as fast as possible. The summary says whether the target rate was held.
+    """
+
+    if persist not in ("none", "files", "database"):
+        raise ValueError(f"Unknown persistence target: {persist}")
+    tool = tool or AutismScreeningTool()
+
+    writer = database = None
+    if persist == "files":
+        from assessment_store import BackgroundResultWriter
+        writer = BackgroundResultWriter(tool, results_dir, save_visualization=chart_backend is not None,
+                                        chart_backend=chart_backend or "svg", layout=layout)
+    elif persist == "database":
+        from assessment_store import AssessmentDatabase
+        database = AssessmentDatabase(database_path)
+
+    latencies, max_lag = [], 0.0
+    sent = 0
+    start = time.perf_counter()
+    try:
+        for chunk in iter_cohort(size, seed, chunk_size=max(batch_size, 10_000), tool=tool, **options):
+            for offset in range(0, len(chunk), batch_size):
+                if rate:
+                    # Wait for this batch's slot; record how far behind schedule we are
+                    delay = start + sent / rate - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    else:
+                        max_lag = max(max_lag, -delay)
+
+                began = time.perf_counter()
+                batch = tool.score_batch(chunk.responses[offset:offset + batch_size],
+                                         chunk.age_months[offset:offset + batch_size])
+                results = [tool.build_result(batch, index, participant_id) for index, participant_id
+                           in enumerate(chunk.participant_ids[offset:offset + batch_size])]
+                if render_reports:
+                    for result in results:
+                        tool.generate_report(result)
+                if writer is not None:
+                    for result in results:
+                        writer.submit(result)
+                if database is not None:
+                    database.extend(results)
+                latencies.append(time.perf_counter() - began)
+                sent += len(results)
+        fed = time.perf_counter()
+    finally:
+        if writer is not None:
+            writer.close()
+        if database is not None:
+            database.close()
+    finished = time.perf_counter()
+
+    elapsed = finished - start
+    achieved = sent / elapsed if elapsed else 0.0
+    summary = {
+        "participants": sent,
+        "target_rate_per_s": rate or None,
+        "achieved_rate_per_s": round(achieved, 1),
+        "elapsed_seconds": round(elapsed, 3),
+        "drain_seconds": round(finished - fed, 3),
+        "batch_size": batch_size,
+        "batch_latency": _latency_summary(latencies),
+        "max_schedule_lag_ms": round(max_lag * 1000, 3),
+        "kept_up": achieved >= 0.95 * rate if rate else None
+    }
+    if writer is not None:
+        summary["write_errors"] = len(writer.errors)
+    return summary
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Generate a synthetic cohort file, or drive one through the pipeline"""
+
+    parser = argparse.ArgumentParser(description="Understanding Together - synthetic cohorts and load tests")
+    parser.add_argument("--size", type=int, default=10_000, help="participants to simulate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--prevalence", type=float, default=DEFAULT_PREVALENCE,
+                        help="share of simulated participants drawn from the autistic trait profile")
+    parser.add_argument("--domain-correlation", type=float, default=DEFAULT_DOMAIN_CORRELATION,
+                        help="how strongly the three domains follow the shared trait level (0-1)")
+    parser.add_argument("--write-cohort", metavar="PATH",
+                        help="write the cohort as JSONL or CSV for --batch runs instead of load testing")
+    parser.add_argument("--labels", action="store_true",
+                        help="with --write-cohort: include each participant's simulated label "
+                             "(for assessment_calibration)")
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="target participants per second (0 = as fast as possible)")
+    parser.add_argument("--batch-size", type=int, default=100, help="participants scored per batch")
+    parser.add_argument("--no-reports", action="store_true", help="skip text report rendering")
+    parser.add_argument("--persist", choices=["none", "files", "database"], default="none")
+    parser.add_argument("--results-dir", default="assessment_results")
+    parser.add_argument("--layout", choices=RESULT_LAYOUTS, default="flat")
+    parser.add_argument("--database", default="assessment_results/assessments.db")
+    parser.add_argument("--chart-backend", choices=["matplotlib", "svg", "png"],
+                        help="with --persist files: also render a chart per participant")
+    parser.add_argument("--metrics", metavar="PATH", help="also write per-stage timings (JSON) here")
+    args = parser.parse_args(argv)
+
+    options = {"prevalence": args.prevalence, "domain_correlation": args.domain_correlation}
+    if args.write_cohort:
+        count = write_cohort(args.write_cohort, args.size, args.seed, args.labels, **options)
+        print(f"📄 Wrote {count} synthetic participants to {args.write_cohort}", file=sys.stderr)
+        return 0
+
+    collector = assessment_metrics.enable() if args.metrics else None
+    summary = run_load_test(args.size, args.rate, args.seed, args.batch_size, not args.no_reports,
+                            args.persist, args.results_dir, args.layout, args.database,
+                            args.chart_backend, **options)
+    if collector is not None:
+        assessment_metrics.disable()
+        collector.write(args.metrics)
+    print(json.dumps(summary, indent=2))
+
+    if summary["kept_up"] is False:
+        print(f"❌ Held {summary['achieved_rate_per_s']:.0f}/s, below the {args.rate:.0f}/s target",
+              file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Understanding Together - Stage instrumentation
+Opt-in wall-time, call-count and tracemalloc peak-memory metrics for the
+stages of an assessment run, exported as JSON or Prometheus text
+
+Instrumentation is off by default; disabled stages cost one global lookup.
+
+    metrics = enable(trace_memory=True)
+    ... run assessments ...
+    print(metrics.to_prometheus())
+"""
+
+import functools
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+class _NullStage:
+    """Shared do-nothing context used while instrumentation is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+class _StageTimer:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics: "StageMetrics", name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        if self.metrics.trace_memory:
+            self.metrics._memory_enter()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        elapsed = time.perf_counter() - self.start
+        peak = self.metrics._memory_exit() if self.metrics.trace_memory else None
+        self.metrics.record(self.name, elapsed, peak, failed=exc_type is not None)
+        return False
+
+class StageMetrics:
+    """
+    Per-stage counters: calls, failures, total/max wall time and peak memory
+    Nested stages are each timed in full (an outer stage includes its inner ones);
+    peak memory is the tracemalloc high-water mark above the stage's starting usage
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def stage(self, name: str) -> _StageTimer:
+        """Context manager timing one execution of a stage"""
+        return _StageTimer(self, name)
+
+    def record(self, name: str, seconds: float, peak_bytes: Optional[int] = None, failed: bool = False):
+        """Add one execution of a stage"""
+
+        with self._lock:
+            entry = self.stages.get(name)
+            if entry is None:
+                entry = self.stages[name] = {"calls": 0, "failures": 0, "total_seconds": 0.0,
+                                             "max_seconds": 0.0, "peak_memory_bytes": None}
+            entry["calls"] += 1
+            entry["failures"] += int(failed)
+            entry["total_seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+            if peak_bytes is not None:
+                entry["peak_memory_bytes"] = max(entry["peak_memory_bytes"] or 0, peak_bytes)
+
+    def merge(self, snapshot: Dict[str, Dict[str, Any]]):
+        """Fold in another collector's to_dict()["stages"] (e.g. from a worker process)"""
+
+        with self._lock:
+            for name, other in snapshot.items():
+                entry = self.stages.setdefault(name, {"calls": 0, "failures": 0, "total_seconds": 0.0,
+                                                      "max_seconds": 0.0, "peak_memory_bytes": None})
+                entry["calls"] += other["calls"]
+                entry["failures"] += other["failures"]
+                entry["total_seconds"] += other["total_seconds"]
+                entry["max_seconds"] = max(entry["max_seconds"], other["max_seconds"])
+                if other.get("peak_memory_bytes") is not None:
+                    entry["peak_memory_bytes"] = max(entry["peak_memory_bytes"] or 0,
+                                                     other["peak_memory_bytes"])
+
+    def reset(self):
+        with self._lock:
+            self.stages.clear()
+
+    def _memory_enter(self):
+        import tracemalloc
+
+        stack = self._memory_stack()
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            # Keep the enclosing stage's high-water mark before the peak is reset
+            stack[-1][1] = max(stack[-1][1], peak)
+        tracemalloc.reset_peak()
+        stack.append([current, current])
+
+    def _memory_exit(self) -> int:
+        import tracemalloc
+
+        stack = self._memory_stack()
+        _, peak = tracemalloc.get_traced_memory()
+        start, seen = stack.pop()
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        return max(seen, peak) - start
+
+    def _memory_stack(self) -> List[List[int]]:
+        stack = getattr(self._local, "memory_stack", None)
+        if stack is None:
+            stack = self._local.memory_stack = []
+        return stack
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Structured snapshot, stages sorted by total time"""
+
+        with self._lock:
+            stages = {name: dict(entry) for name, entry in self.stages.items()}
+        for entry in stages.values():
+            entry["mean_seconds"] = entry["total_seconds"] / entry["calls"] if entry["calls"] else 0.0
+        return {
+            "trace_memory": self.trace_memory,
+            "stages": dict(sorted(stages.items(), key=lambda item: -item[1]["total_seconds"]))
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def to_prometheus(self, prefix: str = "assessment") -> str:
+        """Prometheus text exposition format, one labelled series per stage"""
+
+        stages = self.to_dict()["stages"]
+        series = [
+            ("stage_calls_total", "counter", "Executions of each stage", "calls"),
+            ("stage_failures_total", "counter", "Executions that raised an exception", "failures"),
+            ("stage_seconds_total", "counter", "Wall time spent in each stage", "total_seconds"),
+            ("stage_seconds_max", "gauge", "Slowest single execution of each stage", "max_seconds"),
+        ]
+        if self.trace_memory:
+            series.append(("stage_peak_memory_bytes", "gauge",
+                           "tracemalloc peak above the stage's starting usage", "peak_memory_bytes"))
+
+        lines = []
+        for suffix, kind, description, key in series:
+            name = f"{prefix}_{suffix}"
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for stage, entry in stages.items():
+                if entry[key] is not None:
+                    label = stage.replace("\\", "\\\\").replace('"', '\\"')
+                    lines.append(f'{name}{{stage="{label}"}} {entry[key]:.9g}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str, fmt: str = "json"):
+        """Write the metrics to path as "json" or "prometheus" text"""
+
+        if fmt not in ("json", "prometheus"):
+            raise ValueError(f"Unknown metrics format: {fmt}")
+        with open(path, "w") as f:
+            f.write(self.to_prometheus() if fmt == "prometheus" else self.to_json() + "\n")
+
+_active: Optional[StageMetrics] = None
+_started_tracemalloc = False
+
+def enable(trace_memory: bool = False) -> StageMetrics:
+    """Start collecting stage metrics in this process and return the collector"""
+
+    global _active, _started_tracemalloc
+    if trace_memory:
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracemalloc = True
+    _active = StageMetrics(trace_memory)
+    return _active
+
+def disable() -> Optional[StageMetrics]:
+    """Stop collecting and return the collector that was active, if any"""
+
+    global _active, _started_tracemalloc
+    metrics, _active = _active, None
+    if _started_tracemalloc:
+        import tracemalloc
+        tracemalloc.stop()
+        _started_tracemalloc = False
+    return metrics
+
+def active() -> Optional[StageMetrics]:
+    """The collector currently recording, or None while instrumentation is off"""
+    return _active
+
+def stage(name: str):
+    """Time a block as stage ``name`` (a no-op while instrumentation is off)"""
+
+    metrics = _active
+    return _NULL_STAGE if metrics is None else metrics.stage(name)
+
+def instrumented(name: str) -> Callable[[Callable], Callable]:
+    """Decorator timing every call of a function as stage ``name``"""
+
+    def decorate(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            metrics = _active
+            if metrics is None:
+                return function(*args, **kwargs)
+            with metrics.stage(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Understanding Together - Cohort queries
+Group-by aggregation, filters and percentiles over stored assessment results,
+computed column-wise with NumPy instead of loading results one file at a time
+"""
+
+import argparse
+import csv
+import datetime
+import glob
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from autism_assessment import AGE_GROUPS, RISK_LEVELS, result_from_dict
+from assessment_store import (
+    SCORE_COLUMNS, AgeNormIndex, AssessmentDatabase, ResultColumns, RunningStatistics, ShardedResultStore
+)
+
+GROUP_KEYS = ("age_group", "risk_level", "day", "week", "month")
+METRIC_COLUMNS = (*SCORE_COLUMNS, "total_score", "confidence")
+AGGREGATES = ("count", "mean", "std", "min", "max", "sum")
+
+def load_columns(database: Optional[str] = None, results_dir: Optional[str] = None,
+                 columns_file: Optional[str] = None, **filters: Any) -> ResultColumns:
+    """Load stored results from a database, a .npy columns file or a legacy results directory"""
+
+    if database:
+        with AssessmentDatabase(database) as db:
+            return db.to_columns(**filters)
+
+    if columns_file:
+        columns = ResultColumns.load(columns_file, mmap=True)
+    elif results_dir and ShardedResultStore.exists(results_dir):
+        # Sharded layout: the manifest lists every record, no directory walk needed
+        store = ShardedResultStore(results_dir)
+        columns = ResultColumns.from_results(store.load(entry) for entry in store)
+    elif results_dir:
+        # Legacy one-file-per-participant layout (slow: one json.load per file)
+        columns = ResultColumns()
+        for filename in sorted(glob.glob(os.path.join(results_dir, "*_results.json"))):
+            with open(filename) as f:
+                columns.append(result_from_dict(json.load(f)))
+    else:
+        raise ValueError("Need a database, columns file or results directory")
+
+    conditions = {key: value for key, value in filters.items() if value is not None}
+    return columns.filter(**conditions) if conditions else columns
+
+def _group_codes(columns: ResultColumns, key: str) -> Tuple[np.ndarray, Any]:
+    """Integer codes for one group-by key and a function turning a code into a label"""
+
+    if key == "age_group":
+        return columns.column("age_group").astype(np.int64), lambda code: AGE_GROUPS[code]
+    if key == "risk_level":
+        return columns.column("risk_level").astype(np.int64), lambda code: RISK_LEVELS[code]
+
+    days = columns.column("assessment_date").astype("datetime64[D]").astype(np.int64)
+    if key == "day":
+        return days, lambda code: str(np.datetime64(code, "D"))
+    if key == "week":
+        # Weeks start on Monday (1970-01-01 was a Thursday)
+        return days - (days + 3) % 7, lambda code: str(np.datetime64(code, "D"))
+    if key == "month":
+        months = columns.column("assessment_date").astype("datetime64[M]").astype(np.int64)
+        return months, lambda code: str(np.datetime64(code, "M"))
+    raise ValueError(f"Unknown group-by key: {key} (choose from {', '.join(GROUP_KEYS)})")
+
+def _parse_metric(metric: str) -> Tuple[str, Optional[str], Optional[float]]:
+    """Split "mean:total_score" / "p90:social_communication" / "count" into parts"""
+
+    if metric == "count":
+        return "count", None, None
+    aggregate, _, column = metric.partition(":")
+    if column not in METRIC_COLUMNS:
+        raise ValueError(f"Unknown metric column in {metric!r} (choose from {', '.join(METRIC_COLUMNS)})")
+    if aggregate.startswith("p") and aggregate[1:].replace(".", "", 1).isdigit():
+        percentile = float(aggregate[1:])
+        if not 0 <= percentile <= 100:
+            raise ValueError(f"Percentile out of range in {metric!r}")
+        return "percentile", column, percentile
+    if aggregate not in AGGREGATES:
+        raise ValueError(f"Unknown aggregate in {metric!r} (choose from {', '.join(AGGREGATES)} or pNN)")
+    return aggregate, column, None
+
+def _grouped_percentile(values: np.ndarray, groups: np.ndarray, counts: np.ndarray,
+                        percentile: float) -> np.ndarray:
+    """Linear-interpolated percentile of values within each group, in one sort"""
+
+    order = np.lexsort((values, groups))
+    sorted_values = values[order]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    position = (counts - 1) * (percentile / 100)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, counts - 1)
+    fraction = position - lower
+    return (sorted_values[starts + lower] * (1 - fraction)
+            + sorted_values[starts + upper] * fraction)
+
+def aggregate(columns: ResultColumns, group_by: Sequence[str] = ("age_group",),
+              metrics: Sequence[str] = ("count", "mean:total_score")) -> List[Dict[str, Any]]:
+    """Aggregate metrics per group, one output row per distinct group key combination"""
+
+    parsed = [(metric, *_parse_metric(metric)) for metric in metrics]
+    if len(columns) == 0:
+        return []
+
+    # Combine the group-by keys into one dense group index
+    labelers = []
+    if group_by:
+        codes = []
+        for key in group_by:
+            key_codes, labeler = _group_codes(columns, key)
+            codes.append(key_codes)
+            labelers.append(labeler)
+        keys, groups = np.unique(np.column_stack(codes), axis=0, return_inverse=True)
+        groups = groups.reshape(-1)
+    else:
+        keys, groups = np.zeros((1, 0), dtype=np.int64), np.zeros(len(columns), dtype=np.int64)
+
+    counts = np.bincount(groups, minlength=len(keys))
+    output = {}
+    for metric, aggregate_name, column, percentile in parsed:
+        if aggregate_name == "count":
+            output[metric] = counts
+            continue
+        values = columns.column(column).astype(np.float64)
+        sums = np.bincount(groups, weights=values, minlength=len(keys))
+        if aggregate_name == "sum":
+            output[metric] = sums
+        elif aggregate_name == "mean":
+            output[metric] = sums / counts
+        elif aggregate_name == "std":
+            # Sample standard deviation from deviations about each group mean
+            # (matches RunningStatistics; a single-row group has std 0)
+            means = sums / counts
+            squares = np.bincount(groups, weights=(values - means[groups]) ** 2, minlength=len(keys))
+            output[metric] = np.sqrt(squares / np.maximum(counts - 1, 1))
+        else:
+            percentile = {"min": 0.0, "max": 100.0}.get(aggregate_name, percentile)
+            output[metric] = _grouped_percentile(values, groups, counts, percentile)
+
+    rows = []
+    for index, key in enumerate(keys):
+        row = {name: labeler(int(code)) for name, labeler, code in zip(group_by, labelers, key)}
+        for metric, values in output.items():
+            value = values[index]
+            row[metric] = int(value) if metric == "count" else round(float(value), 4)
+        rows.append(row)
+    return rows
+
+def write_rows(rows: List[Dict[str, Any]], fmt: str = "table", output=None):
+    """Print aggregation rows as an aligned table, JSON or CSV"""
+
+    output = output or sys.stdout
+    if fmt == "json":
+        json.dump(rows, output, indent=2)
+        output.write("\n")
+        return
+    if not rows:
+        output.write("(no matching results)\n")
+        return
+    headers = list(rows[0])
+    if fmt == "csv":
+        writer = csv.DictWriter(output, fieldnames=headers)
+        writer.writeheader()
+        writer.writerows(rows)
+        return
+
+    widths = [max(len(header), *(len(str(row[header])) for row in rows)) for header in headers]
+    output.write("  ".join(header.ljust(width) for header, width in zip(headers, widths)).rstrip() + "\n")
+    output.write("  ".join("─" * width for width in widths) + "\n")
+    for row in rows:
+        output.write("  ".join(str(row[header]).ljust(width)
+                               for header, width in zip(headers, widths)).rstrip() + "\n")
+
+def main(argv: Optional[Sequence[str]] = None):
+    """Command-line cohort queries"""
+
+    parser = argparse.ArgumentParser(description="Understanding Together - cohort queries over stored assessments")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--database", help="SQLite results database")
+    source.add_argument("--columns", help=".npy file written by ResultColumns.save()")
+    source.add_argument("--results-dir", help="directory of saved result files (flat or sharded)")
+    parser.add_argument("--group-by", nargs="*", default=["age_group"], choices=GROUP_KEYS,
+                        help="keys to group by (default: age_group)")
+    parser.add_argument("--metric", action="append", dest="metrics",
+                        help="count, mean|std|min|max|sum:COLUMN or pNN:COLUMN (repeatable)")
+    parser.add_argument("--since", help="first assessment date to include (YYYY-MM-DD)")
+    parser.add_argument("--until", help="assessment date to stop before (YYYY-MM-DD)")
+    parser.add_argument("--last-days", type=int, help="only include the last N days")
+    parser.add_argument("--age-group", choices=AGE_GROUPS)
+    parser.add_argument("--risk-level", choices=RISK_LEVELS)
+    parser.add_argument("--format", choices=["table", "json", "csv"], default="table")
+    parser.add_argument("--statistics", metavar="PATH",
+                        help="print the persisted running statistics instead of querying")
+    parser.add_argument("--norms", metavar="PATH",
+                        help="age-normed percentile index (.npz): print its quartiles or --percentile-of")
+    parser.add_argument("--percentile-of", type=float, nargs="+", metavar="SCORE",
+                        help="with --norms and --age-group: percentile of these total scores in that age group")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="with --statistics or --norms: recompute them from the full store first")
+    args = parser.parse_args(argv)
+
+    if args.norms:
+        if args.rebuild:
+            if not (args.database or args.columns or args.results_dir):
+                parser.error("--rebuild needs --database, --columns or --results-dir")
+            norms = AgeNormIndex.rebuild(load_columns(args.database, args.results_dir, args.columns))
+            norms.save(args.norms)
+        else:
+            norms = AgeNormIndex.load(args.norms)
+        if args.percentile_of:
+            if not args.age_group:
+                parser.error("--percentile-of needs --age-group")
+            percentiles = norms.percentiles(np.array(args.percentile_of), args.age_group)
+            rows = [{"age_group": args.age_group, "total_score": score,
+                     "percentile": None if np.isnan(value) else round(float(value), 1)}
+                    for score, value in zip(args.percentile_of, percentiles.tolist())]
+        else:
+            rows = [{"age_group": age_group, **entry} for age_group, entry in norms.summary().items()]
+        write_rows(rows, args.format)
+        return
+    if args.statistics:
+        if args.rebuild:
+            if not (args.database or args.columns or args.results_dir):
+                parser.error("--rebuild needs --database, --columns or --results-dir")
+            statistics = RunningStatistics.rebuild(load_columns(args.database, args.results_dir, args.columns))
+            statistics.save(args.statistics)
+        else:
+            statistics = RunningStatistics.load(args.statistics)
+        json.dump(statistics.summary(), sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return
+    if not (args.database or args.columns or args.results_dir):
+        parser.error("one of --database, --columns or --results-dir is required")
+
+    start = args.since
+    if args.last_days is not None:
+        start = (datetime.date.today() - datetime.timedelta(days=args.last_days)).isoformat()
+
+    columns = load_columns(args.database, args.results_dir, args.columns, start=start, end=args.until,
+                           age_group=args.age_group, risk_level=args.risk_level)
+    rows = aggregate(columns, args.group_by, args.metrics or ["count", "mean:total_score"])
+    write_rows(rows, args.format)
+
+if __name__ == "__main__":
+    main()
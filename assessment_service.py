@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Understanding Together - Local scoring service
+A long-lived asyncio HTTP/JSON endpoint around AutismScreeningTool that groups
+concurrent requests into small vectorized batches
+
+Endpoints:
+    POST /assess   {"age_months": 48, "responses": {...}, "participant_name": "...",
+                    "include_report": false, "instrument": "...",
+                    "instrument_version": "..."}   (or a list of such records)
+    GET  /health
+    GET  /metrics  (Prometheus text, when started with --metrics)
+"""
+
+import argparse
+import asyncio
+import datetime
+import itertools
+import json
+import queue
+import sys
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import assessment_metrics
+from autism_assessment import (
+    DEFAULT_INSTRUMENT, RESULT_LAYOUTS, SCORING_MODES, AutismScreeningTool, Instrument, RiskThresholdTable,
+    record_age_months, result_to_dict
+)
+
+MAX_BODY_BYTES = 1 << 20
+
+def _check_name_field(record: Dict[str, Any], field: str):
+    """Reject a participant_id/participant_name that could escape the results directory"""
+
+    value = record.get(field)
+    if value in (None, ""):
+        return
+    if not isinstance(value, str):
+        raise TypeError(f"{field} must be a string")
+    if any(part in value for part in ("/", "\\", "..", "\0")):
+        raise ValueError(f"{field} must not contain path separators or '..'")
+
+class MicroBatcher:
+    """
+    Collects concurrent scoring requests and scores them together
+    A batch is flushed when it reaches max_batch requests or when max_delay
+    seconds have passed since its first request arrived
+    """
+
+    def __init__(self, tool: AutismScreeningTool, max_batch: int = 64, max_delay: float = 0.005,
+                 writer=None):
+        self.tool = tool
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.writer = writer
+        self.batches = 0
+        self.scored = 0
+        self._pending: List[Tuple[Dict[str, Any], int, List[int], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._sequence = itertools.count(1)
+
+    def validate(self, record: Dict[str, Any]) -> Tuple[int, List[int]]:
+        """Age and ordered 0-4 ratings of a record (KeyError, TypeError, ValueError or OverflowError if invalid)"""
+
+        # IDs and names become result file names when a writer is attached
+        _check_name_field(record, "participant_id")
+        _check_name_field(record, "participant_name")
+        return record_age_months(record), self.tool.response_vector(record.get("responses", record))
+
+    def submit(self, record: Dict[str, Any],
+               validated: Optional[Tuple[int, List[int]]] = None) -> "asyncio.Future":
+        """Validate a record and queue it; the future resolves to an AssessmentResult"""
+
+        age, row = validated if validated is not None else self.validate(record)
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((record, age, row, future))
+
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_delay, self.flush)
+        return future
+
+    def flush(self):
+        """Score every queued request in one vectorized pass"""
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        try:
+            batch = self.tool.score_batch(np.array([row for _, _, row, _ in pending]),
+                                          np.array([age for _, age, _, _ in pending]))
+        except Exception as e:
+            for *_, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        timestamp = datetime.datetime.now()
+        assessment_date = timestamp.isoformat()
+        for index, (record, _, _, future) in enumerate(pending):
+            participant_id = record.get("participant_id")
+            if not participant_id:
+                name = record.get("participant_name") or "Anonymous"
+                participant_id = f"{name}_{timestamp.strftime('%Y%m%d_%H%M%S')}_{next(self._sequence)}"
+            result = self.tool.build_result(batch, index, participant_id, assessment_date)
+            if future.done():
+                continue
+            if self.writer is not None:
+                # Never wait on the writer here: a full queue would stall the event loop
+                try:
+                    self.writer.submit(result, block=False)
+                except (queue.Full, RuntimeError) as e:
+                    future.set_exception(e)
+                    continue
+            future.set_result(result)
+
+        self.batches += 1
+        self.scored += len(pending)
+
+class ScoringService:
+    """
+    Minimal HTTP/1.1 server (keep-alive, JSON bodies) in front of one MicroBatcher
+    per instrument version; records pick one by name and optional version,
+    defaulting to the first instrument and to the first version of a name
+    """
+
+    def __init__(self, batchers: Dict[Tuple[str, str], MicroBatcher]):
+        self.batchers = batchers
+        self.default_instrument = next(iter(batchers))[0]
+        self.default_versions: Dict[str, str] = {}
+        for name, version in batchers:
+            self.default_versions.setdefault(name, version)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Malformed request line"}, close=True)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, 400, {"error": "Invalid Content-Length"}, close=True)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "Request body too large"}, close=True)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                close = (headers.get("connection", "").lower() == "close"
+                         or (version == "HTTP/1.0" and headers.get("connection", "").lower() != "keep-alive"))
+                try:
+                    status, payload = await self.dispatch(method, path, body)
+                except Exception as e:
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+                await self._respond(writer, status, payload, close)
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        path = path.split("?", 1)[0]
+        if path == "/health":
+            if method != "GET":
+                return 405, {"error": "Use GET"}
+            instruments = {}
+            for (name, version), batcher in self.batchers.items():
+                instruments.setdefault(name, {})[version] = {"scored": batcher.scored, "batches": batcher.batches}
+            return 200, {"status": "ok", "instruments": instruments}
+        if path == "/metrics":
+            collector = assessment_metrics.active()
+            if collector is None:
+                return 404, {"error": "Stage metrics are off (start the service with --metrics)"}
+            return 200, collector.to_prometheus()
+        if path != "/assess":
+            return 404, {"error": f"Unknown path: {path}"}
+        if method != "POST":
+            return 405, {"error": "Use POST"}
+
+        try:
+            payload = json.loads(body or b"null")
+        except json.JSONDecodeError as e:
+            return 400, {"error": f"Invalid JSON: {e}"}
+        records = payload if isinstance(payload, list) else [payload]
+        if not records or not all(isinstance(record, dict) for record in records):
+            return 400, {"error": "Expected a JSON object or a list of objects"}
+
+        keys = []
+        for record in records:
+            name = record.get("instrument", self.default_instrument)
+            if not isinstance(name, str):
+                return 400, {"error": "instrument must be a string"}
+            version = record.get("instrument_version", self.default_versions.get(name, ""))
+            if not isinstance(version, str):
+                return 400, {"error": "instrument_version must be a string"}
+            keys.append((name, version))
+        batchers = [self.batchers.get(key) for key in keys]
+        if None in batchers:
+            available = ", ".join(f"{name} {version}".strip() for name, version in self.batchers)
+            return 400, {"error": f"Unknown instrument (available: {available})"}
+        # Validate the whole payload first so a bad record never leaves earlier ones scored
+        try:
+            validated = [batcher.validate(record) for batcher, record in zip(batchers, records)]
+        except (KeyError, TypeError, ValueError, OverflowError) as e:
+            return 400, {"error": f"Invalid record: {e}"}
+
+        # Admit the payload only if the writer has room for all of it (plus what is
+        # already waiting to be flushed), so a 503 never leaves part of it queued
+        writers = {id(batcher.writer): batcher.writer for batcher in batchers if batcher.writer is not None}
+        for writer in writers.values():
+            waiting = sum(len(batcher._pending) for batcher in self.batchers.values() if batcher.writer is writer)
+            wanted = sum(1 for batcher in batchers if batcher.writer is writer)
+            if writer.free_slots() < waiting + wanted:
+                return 503, {"error": "Result writer is busy, retry later"}
+
+        futures = [batcher.submit(record, checked) for batcher, record, checked in zip(batchers, records, validated)]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        failures = [result for result in results if isinstance(result, Exception)]
+        if any(isinstance(failure, queue.Full) for failure in failures):
+            return 503, {"error": "Result writer is busy, retry later"}
+        if failures:
+            return 500, {"error": f"Scoring failed: {type(failures[0]).__name__}: {failures[0]}"}
+
+        output = []
+        for record, batcher, result in zip(records, batchers, results):
+            data = result_to_dict(result)
+            if record.get("include_report"):
+                data["report"] = batcher.tool.generate_report(result)
+            output.append(data)
+        return 200, output if isinstance(payload, list) else output[0]
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, payload: Any, close: bool = False):
+        reasons = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                   413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+        if isinstance(payload, str):
+            body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+        else:
+            body, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+        writer.write(
+            f"HTTP/1.1 {status} {reasons.get(status, 'Error')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+
+async def serve(host: str = "127.0.0.1", port: int = 8765, max_batch: int = 64, max_delay_ms: float = 5.0,
+                thresholds_path: Optional[str] = None, results_dir: Optional[str] = None,
+                layout: str = "flat", scoring: str = "lookup", instrument_paths: Sequence[str] = ()):
+    """Run the scoring service until cancelled"""
+
+    thresholds = RiskThresholdTable.from_file(thresholds_path) if thresholds_path else None
+    instruments = [Instrument.from_file(path) for path in instrument_paths] or [DEFAULT_INSTRUMENT]
+    tools = {(instrument.name, instrument.version): AutismScreeningTool(thresholds, scoring, instrument=instrument)
+             for instrument in instruments}
+    if len(tools) != len(instruments):
+        raise ValueError("Instruments served side by side need distinct names or versions")
+
+    writer = None
+    if results_dir:
+        from assessment_store import BackgroundResultWriter
+        writer = BackgroundResultWriter(next(iter(tools.values())), results_dir, layout=layout)
+
+    service = ScoringService({key: MicroBatcher(tool, max_batch, max_delay_ms / 1000, writer)
+                              for key, tool in tools.items()})
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"🤝 Understanding Together scoring service on http://{host}:{port} "
+          f"(batches of up to {max_batch}, {max_delay_ms} ms window; "
+          f"instruments: {', '.join(f'{name} {version}'.strip() for name, version in tools)})", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if writer is not None:
+            writer.close()
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Understanding Together - local scoring service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch", type=int, default=64, help="largest micro-batch scored at once")
+    parser.add_argument("--max-delay-ms", type=float, default=5.0,
+                        help="how long the first request in a batch waits for company")
+    parser.add_argument("--thresholds", metavar="CONFIG", help="JSON or TOML risk threshold set")
+    parser.add_argument("--instrument", action="append", dest="instruments", default=[], metavar="PATH",
+                        help="JSON or TOML indicator definitions to serve (repeatable; default: built-in)")
+    parser.add_argument("--scoring", choices=SCORING_MODES, default="lookup",
+                        help="domain scores from precomputed tables (default) or computed per request")
+    parser.add_argument("--metrics", action="store_true", help="record stage timings and serve them at /metrics")
+    parser.add_argument("--results-dir", help="also write result files here through a background writer")
+    parser.add_argument("--layout", choices=RESULT_LAYOUTS, default="flat",
+                        help="with --results-dir: flat directory or hashed subdirectories with a manifest")
+    args = parser.parse_args(argv)
+
+    if args.metrics:
+        assessment_metrics.enable()
+    try:
+        asyncio.run(serve(args.host, args.port, args.max_batch, args.max_delay_ms,
+                          args.thresholds, args.results_dir, args.layout, args.scoring, args.instruments))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1056 @@
+#!/usr/bin/env python3
+"""
+Understanding Together - Assessment result storage
+Compact columnar containers for keeping large numbers of results in memory,
+an indexed SQLite database for persisting them, running cohort statistics,
+age-normed percentile indexes, a sharded manifest-indexed layout and a background writer for the per-participant
+result files
+"""
+
+import bisect
+import datetime
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from autism_assessment import (
+    AGE_GROUPS, RECOMMENDATION_SETS, RESULT_LAYOUTS, RISK_LEVELS, AssessmentResult, AutismScreeningTool,
+    BatchScores, result_from_dict, result_to_dict
+)
+
+# Width (UTF-8 bytes) of the participant ID column; ResultColumns widens it
+# in steps of this size when a longer ID is stored
+PARTICIPANT_ID_BYTES = 64
+
+SCORE_COLUMNS = ("social_communication", "behavioral_patterns", "communication_language")
+
+def result_dtype(id_bytes: int = PARTICIPANT_ID_BYTES) -> np.dtype:
+    """Row layout with a participant ID column of ``id_bytes`` bytes"""
+    return np.dtype([
+        ("participant_id", f"S{id_bytes}"),
+        ("assessment_date", "datetime64[us]"),
+        ("age_group", "u1"),
+        ("social_communication", "f4"),
+        ("behavioral_patterns", "f4"),
+        ("communication_language", "f4"),
+        ("total_score", "f4"),
+        ("risk_level", "u1"),
+        ("confidence", "f4"),
+        ("recommendation_set_id", "i2")
+    ])
+
+# One row per assessment; scores are stored at report precision (2 dp, confidence 1 dp)
+RESULT_DTYPE = result_dtype()
+
+AGE_GROUP_CODES = {group: code for code, group in enumerate(AGE_GROUPS)}
+RISK_LEVEL_CODES = {level: code for code, level in enumerate(RISK_LEVELS)}
+RECOMMENDATION_SET_CODES = {recommendations: code for code, recommendations in enumerate(RECOMMENDATION_SETS)}
+
+def _encode_participant_id(participant_id: str) -> bytes:
+    return participant_id.encode("utf-8")
+
+def _id_bytes(longest: int) -> int:
+    """Participant ID column width that fits IDs of ``longest`` bytes"""
+    return max(1, -(-longest // PARTICIPANT_ID_BYTES)) * PARTICIPANT_ID_BYTES
+
+def _encode_date(assessment_date: str) -> np.datetime64:
+    timestamp = datetime.datetime.fromisoformat(assessment_date)
+    if timestamp.tzinfo is not None:
+        raise ValueError(f"Timezone-aware assessment dates are not supported: {assessment_date}")
+    return np.datetime64(timestamp, "us")
+
+def round_half_like_python(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """np.round that agrees with built-in round() (used by build_result for confidence) on near-ties"""
+
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, ndigits)
+    scaled = values * 10 ** ndigits
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    rounded[near_tie] = [round(float(value), ndigits) for value in values[near_tie]]
+    return rounded
+
+def encode_result(result: AssessmentResult) -> tuple:
+    """Convert an AssessmentResult to a RESULT_DTYPE row"""
+
+    if result.age_group not in AGE_GROUP_CODES:
+        raise ValueError(f"Unknown age group: {result.age_group}")
+    if result.risk_level not in RISK_LEVEL_CODES:
+        raise ValueError(f"Unknown risk level: {result.risk_level}")
+
+    recommendation_set = result.recommendation_set_id
+    if recommendation_set is None:
+        recommendation_set = RECOMMENDATION_SET_CODES.get(tuple(result.recommendations))
+        if recommendation_set is None:
+            raise ValueError(f"{result.participant_id} has recommendations outside RECOMMENDATION_SETS")
+
+    return (
+        _encode_participant_id(result.participant_id),
+        _encode_date(result.assessment_date),
+        AGE_GROUP_CODES[result.age_group],
+        *(result.scores[name] for name in SCORE_COLUMNS),
+        result.total_score,
+        RISK_LEVEL_CODES[result.risk_level],
+        result.confidence,
+        recommendation_set
+    )
+
+def decode_result(row: np.void) -> AssessmentResult:
+    """Convert a RESULT_DTYPE row back to an AssessmentResult"""
+
+    recommendation_set = int(row["recommendation_set_id"])
+    if recommendation_set < 0:
+        raise ValueError("Row was loaded without its recommendation list")
+    return AssessmentResult(
+        participant_id=row["participant_id"].decode("utf-8"),
+        age_group=AGE_GROUPS[row["age_group"]],
+        assessment_date=row["assessment_date"].astype(datetime.datetime).isoformat(),
+        scores={name: round(float(row[name]), 2) for name in SCORE_COLUMNS},
+        total_score=round(float(row["total_score"]), 2),
+        risk_level=RISK_LEVELS[row["risk_level"]],
+        recommendations=RECOMMENDATION_SETS[recommendation_set],
+        confidence=round(float(row["confidence"]), 1),
+        recommendation_set_id=recommendation_set
+    )
+
+class ResultColumns:
+    """
+    Columnar, append-only container of assessment results
+    Backed by a NumPy structured array (RESULT_DTYPE) that grows geometrically;
+    the participant ID column is widened whenever a longer ID is appended
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._data = np.zeros(max(capacity, 1), dtype=RESULT_DTYPE)
+        self._size = 0
+
+    @classmethod
+    def from_array(cls, data: np.ndarray) -> "ResultColumns":
+        """Wrap an existing RESULT_DTYPE array (any ID width) without copying it"""
+
+        if data.dtype.names != RESULT_DTYPE.names or data.dtype != result_dtype(data.dtype["participant_id"].itemsize):
+            raise ValueError("Array does not use RESULT_DTYPE")
+        columns = cls.__new__(cls)
+        columns._data = data
+        columns._size = len(data)
+        return columns
+
+    @classmethod
+    def from_results(cls, results: Iterable[AssessmentResult]) -> "ResultColumns":
+        columns = cls()
+        columns.extend(results)
+        return columns
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = False) -> "ResultColumns":
+        """Load columns written by save(), optionally memory-mapped read-only"""
+        return cls.from_array(np.load(path, mmap_mode="r" if mmap else None))
+
+    def save(self, path: str):
+        """Write the rows to a .npy file"""
+        np.save(path, self.data)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def data(self) -> np.ndarray:
+        """Structured view of the stored rows (no copy)"""
+        return self._data[:self._size]
+
+    def column(self, name: str) -> np.ndarray:
+        """Zero-copy view of one column"""
+        return self._data[name][:self._size]
+
+    @property
+    def id_bytes(self) -> int:
+        """Current width of the participant ID column"""
+        return self._data.dtype["participant_id"].itemsize
+
+    def _reserve(self, extra: int, id_bytes: int = 0):
+        needed = self._size + extra
+        if (needed <= len(self._data) and id_bytes <= self.id_bytes
+                and self._data.flags.writeable and self._data.base is None):
+            return
+        capacity = max(needed, 2 * len(self._data), 1024)
+        grown = np.zeros(capacity, dtype=result_dtype(max(self.id_bytes, _id_bytes(id_bytes))))
+        grown[:self._size] = self._data[:self._size]
+        self._data = grown
+
+    def append(self, result: AssessmentResult):
+        row = encode_result(result)
+        self._reserve(1, len(row[0]))
+        self._data[self._size] = row
+        self._size += 1
+
+    def extend(self, results: Iterable[AssessmentResult]):
+        rows = [encode_result(result) for result in results]
+        longest = max((len(row[0]) for row in rows), default=0)
+        self.extend_array(np.array(rows, dtype=result_dtype(_id_bytes(longest))))
+
+    def extend_array(self, rows: np.ndarray):
+        """Append rows that are already in RESULT_DTYPE form (any ID width)"""
+        self._reserve(len(rows), rows.dtype["participant_id"].itemsize)
+        self._data[self._size:self._size + len(rows)] = rows
+        self._size += len(rows)
+
+    def extend_batch(self, batch: BatchScores, participant_ids: Sequence[str],
+                     assessment_date: Optional[str] = None):
+        """Append a scored batch directly, without building AssessmentResult objects"""
+
+        n = len(batch)
+        if len(participant_ids) != n:
+            raise ValueError("Need one participant ID per scored row")
+        encoded_ids = [_encode_participant_id(pid) for pid in participant_ids]
+        self._reserve(n, max(map(len, encoded_ids), default=0))
+        rows = self._data[self._size:self._size + n]
+
+        rows["participant_id"] = encoded_ids
+        rows["assessment_date"] = _encode_date(assessment_date or datetime.datetime.now().isoformat())
+        age_groups = np.asarray(batch.age_groups)
+        for code, group in enumerate(AGE_GROUPS):
+            rows["age_group"][age_groups == group] = code
+        rows["social_communication"] = np.round(batch.social, 2)
+        rows["behavioral_patterns"] = np.round(batch.behavioral, 2)
+        rows["communication_language"] = np.round(batch.communication, 2)
+        rows["total_score"] = np.round(batch.total, 2)
+        rows["risk_level"] = batch.risk_codes
+        rows["confidence"] = round_half_like_python(batch.confidence, 1)
+        rows["recommendation_set_id"] = batch.recommendation_set_ids
+        self._size += n
+
+    def __getitem__(self, key: Union[int, slice, np.ndarray, Sequence[int]]) -> Union[AssessmentResult, "ResultColumns"]:
+        """Index a single result, slice (view) or select rows (copy)"""
+
+        if isinstance(key, (int, np.integer)):
+            if key < 0:
+                key += self._size
+            if not 0 <= key < self._size:
+                raise IndexError("result index out of range")
+            return decode_result(self._data[key])
+        return ResultColumns.from_array(self.data[key])
+
+    def __iter__(self) -> Iterator[AssessmentResult]:
+        return self.to_results()
+
+    def to_results(self) -> Iterator[AssessmentResult]:
+        for row in self.data:
+            yield decode_result(row)
+
+    def mask(self, age_group: Optional[str] = None, risk_level: Optional[str] = None,
+             start: Optional[str] = None, end: Optional[str] = None) -> np.ndarray:
+        """Boolean row mask for common filters (``end`` is exclusive)"""
+
+        mask = np.ones(self._size, dtype=bool)
+        if age_group is not None:
+            mask &= self.column("age_group") == AGE_GROUP_CODES[age_group]
+        if risk_level is not None:
+            mask &= self.column("risk_level") == RISK_LEVEL_CODES[risk_level]
+        if start is not None:
+            mask &= self.column("assessment_date") >= np.datetime64(start, "us")
+        if end is not None:
+            mask &= self.column("assessment_date") < np.datetime64(end, "us")
+        return mask
+
+    def filter(self, mask: Optional[np.ndarray] = None, **conditions: Any) -> "ResultColumns":
+        """Rows matching a boolean mask and/or mask() conditions"""
+
+        if mask is None:
+            mask = np.ones(self._size, dtype=bool)
+        if conditions:
+            mask = mask & self.mask(**conditions)
+        return self[mask]
+
+    def summary(self) -> Dict[str, Any]:
+        """Row count and memory footprint"""
+        return {"rows": self._size, "bytes": self.data.nbytes, "bytes_per_row": self._data.dtype.itemsize}
+
+class AssessmentDatabase:
+    """
+    Indexed, append-only SQLite store for assessment results
+    Writes are buffered and committed in groups; the database runs in WAL mode
+    so readers are never blocked by the writer
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS assessments (
+        id INTEGER PRIMARY KEY,
+        participant_id TEXT NOT NULL,
+        assessment_date TEXT NOT NULL,
+        age_group TEXT NOT NULL,
+        social_communication REAL NOT NULL,
+        behavioral_patterns REAL NOT NULL,
+        communication_language REAL NOT NULL,
+        total_score REAL NOT NULL,
+        risk_level TEXT NOT NULL,
+        confidence REAL NOT NULL,
+        recommendation_set_id INTEGER,
+        recommendations TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_assessments_participant ON assessments (participant_id);
+    CREATE INDEX IF NOT EXISTS idx_assessments_date ON assessments (assessment_date);
+    CREATE INDEX IF NOT EXISTS idx_assessments_risk_date ON assessments (risk_level, assessment_date);
+    """
+
+    COLUMNS = ("participant_id", "assessment_date", "age_group", *SCORE_COLUMNS,
+               "total_score", "risk_level", "confidence", "recommendation_set_id", "recommendations")
+
+    def __init__(self, path: str = "assessment_results/assessments.db", batch_size: int = 500,
+                 statistics_path: Optional[str] = None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.batch_size = batch_size
+        self._pending = []
+
+        # Running statistics are persisted after every group commit
+        self.statistics_path = statistics_path
+        self.statistics = RunningStatistics.load(statistics_path) if statistics_path else None
+
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(self.SCHEMA)
+
+    def __enter__(self) -> "AssessmentDatabase":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Commit pending rows and close the connection"""
+        if self.connection is not None:
+            self.flush()
+            self.connection.close()
+            self.connection = None
+
+    @staticmethod
+    def _encode(result: AssessmentResult) -> tuple:
+        recommendation_set = result.recommendation_set_id
+        if recommendation_set is None:
+            recommendation_set = RECOMMENDATION_SET_CODES.get(tuple(result.recommendations))
+        # Only recommendation lists outside RECOMMENDATION_SETS are stored in full
+        recommendations = None if recommendation_set is not None else json.dumps(list(result.recommendations))
+        return (
+            result.participant_id,
+            result.assessment_date,
+            result.age_group,
+            *(result.scores[name] for name in SCORE_COLUMNS),
+            result.total_score,
+            result.risk_level,
+            result.confidence,
+            recommendation_set,
+            recommendations
+        )
+
+    @staticmethod
+    def _decode(row: tuple) -> AssessmentResult:
+        (participant_id, assessment_date, age_group, social, behavioral, communication,
+         total_score, risk_level, confidence, recommendation_set, recommendations) = row
+        return AssessmentResult(
+            participant_id=participant_id,
+            age_group=age_group,
+            assessment_date=assessment_date,
+            scores=dict(zip(SCORE_COLUMNS, (social, behavioral, communication))),
+            total_score=total_score,
+            risk_level=risk_level,
+            recommendations=(RECOMMENDATION_SETS[recommendation_set] if recommendation_set is not None
+                             else json.loads(recommendations)),
+            confidence=confidence,
+            recommendation_set_id=recommendation_set
+        )
+
+    def append(self, result: AssessmentResult):
+        """Queue a result; the queue is committed once it reaches batch_size"""
+        self._pending.append(self._encode(result))
+        if self.statistics is not None:
+            self.statistics.update(result)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def extend(self, results: Iterable[AssessmentResult]):
+        for result in results:
+            self.append(result)
+
+    def flush(self):
+        """Group-commit every queued result in a single transaction"""
+        if not self._pending:
+            return
+        placeholders = ", ".join("?" * len(self.COLUMNS))
+        with self.connection:
+            self.connection.executemany(
+                f"INSERT INTO assessments ({', '.join(self.COLUMNS)}) VALUES ({placeholders})",
+                self._pending
+            )
+        self._pending = []
+        if self.statistics is not None:
+            self.statistics.save(self.statistics_path)
+
+    def rebuild_statistics(self) -> "RunningStatistics":
+        """Recompute the running statistics from every stored row"""
+        self.statistics = RunningStatistics.rebuild(self.to_columns())
+        if self.statistics_path:
+            self.statistics.save(self.statistics_path)
+        return self.statistics
+
+    def _where(self, participant_id: Optional[str] = None, start: Optional[str] = None,
+               end: Optional[str] = None, risk_level: Optional[str] = None,
+               age_group: Optional[str] = None) -> Tuple[str, list]:
+        """SQL WHERE clause for the supported filters (``end`` is exclusive)"""
+        clauses, params = [], []
+        for column, operator, value in (("participant_id", "=", participant_id),
+                                        ("assessment_date", ">=", start),
+                                        ("assessment_date", "<", end),
+                                        ("risk_level", "=", risk_level),
+                                        ("age_group", "=", age_group)):
+            if value is not None:
+                clauses.append(f"{column} {operator} ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, **filters: Any) -> Iterator[AssessmentResult]:
+        """Stream stored results matching participant_id, start/end date, risk_level or age_group"""
+        self.flush()
+        where, params = self._where(**filters)
+        cursor = self.connection.execute(
+            f"SELECT {', '.join(self.COLUMNS)} FROM assessments{where} ORDER BY id", params
+        )
+        for row in cursor:
+            yield self._decode(row)
+
+    def by_participant(self, participant_id: str) -> List[AssessmentResult]:
+        return list(self.query(participant_id=participant_id))
+
+    def by_date_range(self, start: Optional[str] = None, end: Optional[str] = None) -> Iterator[AssessmentResult]:
+        return self.query(start=start, end=end)
+
+    def by_risk_level(self, risk_level: str, start: Optional[str] = None,
+                      end: Optional[str] = None) -> Iterator[AssessmentResult]:
+        return self.query(risk_level=risk_level, start=start, end=end)
+
+    def count(self, **filters: Any) -> int:
+        self.flush()
+        where, params = self._where(**filters)
+        return self.connection.execute(f"SELECT COUNT(*) FROM assessments{where}", params).fetchone()[0]
+
+    def to_columns(self, chunk_size: int = 100_000, **filters: Any) -> ResultColumns:
+        """Load matching results into a ResultColumns container
+
+        Rows are converted column by column in chunks instead of one
+        AssessmentResult at a time. Rows with recommendations outside
+        RECOMMENDATION_SETS get recommendation_set_id -1.
+        """
+        columns = ResultColumns(capacity=self.count(**filters))
+        where, params = self._where(**filters)
+        cursor = self.connection.execute(
+            f"SELECT {', '.join(self.COLUMNS[:-1])} FROM assessments{where} ORDER BY id", params
+        )
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return columns
+            (participant_ids, dates, age_groups, social, behavioral, communication,
+             total_scores, risk_levels, confidence, recommendation_sets) = zip(*rows)
+
+            encoded_ids = [_encode_participant_id(pid) for pid in participant_ids]
+            chunk = np.zeros(len(rows), dtype=result_dtype(_id_bytes(max(map(len, encoded_ids)))))
+            chunk["participant_id"] = encoded_ids
+            chunk["assessment_date"] = np.array(dates, dtype="datetime64[us]")
+            chunk["age_group"] = [AGE_GROUP_CODES[group] for group in age_groups]
+            chunk["social_communication"] = social
+            chunk["behavioral_patterns"] = behavioral
+            chunk["communication_language"] = communication
+            chunk["total_score"] = total_scores
+            chunk["risk_level"] = [RISK_LEVEL_CODES[level] for level in risk_levels]
+            chunk["confidence"] = confidence
+            chunk["recommendation_set_id"] = [-1 if code is None else code for code in recommendation_sets]
+            columns.extend_array(chunk)
+
+    def export_json(self, results_dir: str = "assessment_results", compact_recommendations: bool = False,
+                    **filters: Any) -> int:
+        """Write matching results as the legacy per-participant *_results.json files"""
+        os.makedirs(results_dir, exist_ok=True)
+        count = 0
+        for result in self.query(**filters):
+            with open(f"{results_dir}/{result.participant_id}_results.json", "w") as f:
+                json.dump(result_to_dict(result, compact_recommendations), f, indent=2)
+            count += 1
+        return count
+
+class RunningStatistics:
+    """
+    Streaming cohort statistics updated as results are stored
+    Counts per risk level and age group, plus Welford/Chan running mean,
+    variance, min and max for each domain score and the total score
+    """
+
+    SCORE_FIELDS = (*SCORE_COLUMNS, "total_score")
+
+    def __init__(self):
+        self.count = 0
+        self.risk_counts = np.zeros((len(AGE_GROUPS), len(RISK_LEVELS)), dtype=np.int64)
+        self.means = np.zeros(len(self.SCORE_FIELDS))
+        self.m2 = np.zeros(len(self.SCORE_FIELDS))
+        self.minimum = np.full(len(self.SCORE_FIELDS), np.inf)
+        self.maximum = np.full(len(self.SCORE_FIELDS), -np.inf)
+
+    def update(self, result: AssessmentResult):
+        """Add one result (Welford's online update)"""
+
+        self.risk_counts[AGE_GROUP_CODES[result.age_group], RISK_LEVEL_CODES[result.risk_level]] += 1
+        values = np.array([*(result.scores[name] for name in SCORE_COLUMNS), result.total_score])
+        self.count += 1
+        delta = values - self.means
+        self.means += delta / self.count
+        self.m2 += delta * (values - self.means)
+        np.minimum(self.minimum, values, out=self.minimum)
+        np.maximum(self.maximum, values, out=self.maximum)
+
+    def update_columns(self, columns: ResultColumns):
+        """Add many results at once by merging their batch statistics"""
+
+        if len(columns) == 0:
+            return
+        np.add.at(self.risk_counts, (columns.column("age_group"), columns.column("risk_level")), 1)
+        # Undo float32 storage noise so batch and per-result updates agree
+        values = np.round(np.column_stack([columns.column(name) for name in self.SCORE_FIELDS]).astype(np.float64), 2)
+        batch = RunningStatistics()
+        batch.count = len(values)
+        batch.means = values.mean(axis=0)
+        batch.m2 = ((values - batch.means) ** 2).sum(axis=0)
+        batch.minimum = values.min(axis=0)
+        batch.maximum = values.max(axis=0)
+        self._merge_moments(batch)
+
+    def merge(self, other: "RunningStatistics"):
+        """Combine statistics gathered separately (Chan et al. parallel update)"""
+        self.risk_counts += other.risk_counts
+        self._merge_moments(other)
+
+    def _merge_moments(self, other: "RunningStatistics"):
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.means - self.means
+        self.means = self.means + delta * other.count / total
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+        self.minimum = np.minimum(self.minimum, other.minimum)
+        self.maximum = np.maximum(self.maximum, other.maximum)
+
+    @classmethod
+    def rebuild(cls, columns: ResultColumns) -> "RunningStatistics":
+        """Recompute the statistics from a full set of stored results"""
+        statistics = cls()
+        statistics.update_columns(columns)
+        return statistics
+
+    def summary(self) -> Dict[str, Any]:
+        """Counts and per-score mean, variance (sample), standard deviation, min and max"""
+
+        scores = {}
+        for index, name in enumerate(self.SCORE_FIELDS):
+            variance = self.m2[index] / (self.count - 1) if self.count > 1 else 0.0
+            scores[name] = {
+                "mean": round(float(self.means[index]), 4) if self.count else None,
+                "variance": round(float(variance), 6),
+                "std": round(float(np.sqrt(variance)), 4),
+                "min": float(self.minimum[index]) if self.count else None,
+                "max": float(self.maximum[index]) if self.count else None
+            }
+        return {
+            "count": self.count,
+            "risk_levels": dict(zip(RISK_LEVELS, self.risk_counts.sum(axis=0).tolist())),
+            "age_groups": dict(zip(AGE_GROUPS, self.risk_counts.sum(axis=1).tolist())),
+            "scores": scores
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "risk_counts": {group: dict(zip(RISK_LEVELS, row)) for group, row in
+                            zip(AGE_GROUPS, self.risk_counts.tolist())},
+            "moments": {name: {"mean": float(self.means[i]), "m2": float(self.m2[i]),
+                               "min": float(self.minimum[i]), "max": float(self.maximum[i])}
+                        for i, name in enumerate(self.SCORE_FIELDS)},
+            "updated": datetime.datetime.now().isoformat()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RunningStatistics":
+        statistics = cls()
+        statistics.count = data["count"]
+        for group, row in data["risk_counts"].items():
+            for level, count in row.items():
+                statistics.risk_counts[AGE_GROUP_CODES[group], RISK_LEVEL_CODES[level]] = count
+        for i, name in enumerate(cls.SCORE_FIELDS):
+            moments = data["moments"][name]
+            statistics.means[i] = moments["mean"]
+            statistics.m2[i] = moments["m2"]
+            statistics.minimum[i] = moments["min"]
+            statistics.maximum[i] = moments["max"]
+        return statistics
+
+    def save(self, path: str):
+        """Persist atomically so readers never see a half-written file"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str) -> "RunningStatistics":
+        """Read persisted statistics (empty statistics if the file does not exist yet)"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+class StatisticsRecorder:
+    """
+    Save hook that keeps RunningStatistics up to date next to stored results
+    Usage: tool.save_hooks.append(StatisticsRecorder("assessment_results/statistics.json"))
+    """
+
+    def __init__(self, path: str = "assessment_results/statistics.json", persist_every: int = 1):
+        self.path = path
+        self.persist_every = max(1, persist_every)
+        self.statistics = RunningStatistics.load(path)
+        self._unsaved = 0
+
+    def __call__(self, result: AssessmentResult):
+        self.statistics.update(result)
+        self._unsaved += 1
+        if self._unsaved >= self.persist_every:
+            self.flush()
+
+    def flush(self):
+        if self._unsaved:
+            self.statistics.save(self.path)
+            self._unsaved = 0
+
+class AgeNormIndex:
+    """
+    Sorted total scores per age group, for reporting a result as a percentile
+    of its age cohort without rescanning the stored history
+    New scores go to a small sorted buffer that is merged into the main array
+    once it outgrows ``merge_every``; queries binary-search both (O(log n)).
+    Percentiles use mid-ranks: 100 * (scores below + half the equal scores) / n.
+    """
+
+    def __init__(self, merge_every: int = 1024):
+        self.merge_every = merge_every
+        self._sorted = [np.empty(0) for _ in AGE_GROUPS]
+        self._pending: List[List[float]] = [[] for _ in AGE_GROUPS]
+
+    @staticmethod
+    def _scores(values: Any) -> np.ndarray:
+        # Stored scores are at report precision; undo float32 noise so ties compare equal
+        return np.round(np.asarray(values, dtype=np.float64), 2)
+
+    def update(self, result: AssessmentResult):
+        """Add one result"""
+
+        code = AGE_GROUP_CODES[result.age_group]
+        pending = self._pending[code]
+        bisect.insort(pending, round(float(result.total_score), 2))
+        if len(pending) >= self.merge_every:
+            self._merge(code)
+
+    def update_columns(self, columns: ResultColumns):
+        """Add many results at once (one sort per age group)"""
+
+        groups = columns.column("age_group")
+        scores = self._scores(columns.column("total_score"))
+        for code in np.unique(groups):
+            self._merge(int(code), scores[groups == code])
+
+    def _merge(self, code: int, extra: Optional[np.ndarray] = None):
+        parts = [self._sorted[code], np.array(self._pending[code])]
+        if extra is not None:
+            parts.append(extra)
+        self._sorted[code] = np.sort(np.concatenate(parts), kind="stable")
+        self._pending[code] = []
+
+    @classmethod
+    def rebuild(cls, columns: ResultColumns, merge_every: int = 1024) -> "AgeNormIndex":
+        """Build the index from a full set of stored results"""
+        index = cls(merge_every)
+        index.update_columns(columns)
+        return index
+
+    def count(self, age_group: str) -> int:
+        code = AGE_GROUP_CODES[age_group]
+        return len(self._sorted[code]) + len(self._pending[code])
+
+    def percentile(self, total_score: float, age_group: str) -> Optional[float]:
+        """Mid-rank percentile of a total score within its age group (None for an empty group)"""
+
+        code = AGE_GROUP_CODES[age_group]
+        n = self.count(age_group)
+        if n == 0:
+            return None
+        score = round(float(total_score), 2)
+        main, pending = self._sorted[code], self._pending[code]
+        below = int(np.searchsorted(main, score, side="left")) + bisect.bisect_left(pending, score)
+        at_or_below = int(np.searchsorted(main, score, side="right")) + bisect.bisect_right(pending, score)
+        return 100.0 * (below + at_or_below) / (2 * n)
+
+    def percentiles(self, total_scores: np.ndarray,
+                    age_groups: Union[str, Sequence[str], np.ndarray]) -> np.ndarray:
+        """Vectorized percentile() for arrays of scores (NaN where the age group is empty)"""
+
+        scores = self._scores(total_scores)
+        if isinstance(age_groups, str):
+            age_groups = np.full(scores.shape, age_groups, dtype=object)
+        age_groups = np.asarray(age_groups)
+        output = np.full(scores.shape, np.nan)
+        for age_group in np.unique(age_groups) if age_groups.size else ():
+            code = AGE_GROUP_CODES[age_group]
+            if self._pending[code]:
+                self._merge(code)
+            norms = self._sorted[code]
+            if len(norms):
+                mask = age_groups == age_group
+                below = np.searchsorted(norms, scores[mask], side="left")
+                at_or_below = np.searchsorted(norms, scores[mask], side="right")
+                output[mask] = 100.0 * (below + at_or_below) / (2 * len(norms))
+        return output
+
+    def summary(self) -> Dict[str, Any]:
+        """Size and quartiles of each age group's norms"""
+
+        groups = {}
+        for code, age_group in enumerate(AGE_GROUPS):
+            if self._pending[code]:
+                self._merge(code)
+            norms = self._sorted[code]
+            groups[age_group] = {"count": len(norms)}
+            if len(norms):
+                p25, p50, p75 = np.percentile(norms, [25, 50, 75])
+                groups[age_group].update(p25=round(float(p25), 2), p50=round(float(p50), 2),
+                                         p75=round(float(p75), 2))
+        return groups
+
+    def save(self, path: str):
+        """Persist atomically as an .npz archive, one sorted array per age group"""
+
+        for code in range(len(AGE_GROUPS)):
+            if self._pending[code]:
+                self._merge(code)
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as f:
+            np.savez(f, **dict(zip(AGE_GROUPS, self._sorted)))
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str, merge_every: int = 1024) -> "AgeNormIndex":
+        """Read a saved index (an empty index if the file does not exist yet)"""
+
+        index = cls(merge_every)
+        if os.path.exists(path):
+            with np.load(path) as data:
+                for code, age_group in enumerate(AGE_GROUPS):
+                    if age_group in data:
+                        index._sorted[code] = data[age_group]
+        return index
+
+# Append-only index of every record saved in the sharded layout
+MANIFEST_NAME = "manifest.jsonl"
+
+class ResultIdGenerator:
+    """
+    Collision-free record IDs that increase monotonically within a process
+    An ID is the time in microseconds (bumped past the previous ID when the
+    clock has not moved on) followed by the process ID, so concurrent threads
+    and save workers never hand out the same one
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last = 0
+
+    def __call__(self) -> str:
+        with self._lock:
+            self._last = max(time.time_ns() // 1000, self._last + 1)
+            stamp = self._last
+        return f"{stamp:014x}-{os.getpid():x}"
+
+new_record_id = ResultIdGenerator()
+
+class ShardedResultStore:
+    """
+    Per-participant result files spread over hashed subdirectories
+    Files live at <results_dir>/<ab>/<cd>/<record id>_results.json (plus the
+    report and chart), and every saved record is appended to
+    <results_dir>/manifest.jsonl, so lookups read the manifest instead of
+    listing ever-growing directories
+    """
+
+    def __init__(self, results_dir: str = "assessment_results", levels: int = 2):
+        if not 1 <= levels <= 4:
+            raise ValueError("levels must be between 1 and 4")
+        self.results_dir = results_dir
+        self.levels = levels
+        self.manifest_path = os.path.join(results_dir, MANIFEST_NAME)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._by_participant: Dict[str, List[str]] = {}
+        self._offset = 0
+
+    @staticmethod
+    def exists(results_dir: str) -> bool:
+        """Whether results_dir holds a sharded layout (has a manifest)"""
+        return os.path.exists(os.path.join(results_dir, MANIFEST_NAME))
+
+    def shard(self, record_id: str) -> str:
+        """Relative shard directory for a record ID, such as 3f/a0"""
+        digest = hashlib.blake2b(record_id.encode("utf-8"), digest_size=self.levels).hexdigest()
+        return "/".join(digest[i:i + 2] for i in range(0, len(digest), 2))
+
+    def allocate(self) -> Tuple[str, str]:
+        """A new record ID and the (created) directory its files belong in"""
+        record_id = new_record_id()
+        directory = f"{self.results_dir}/{self.shard(record_id)}"
+        os.makedirs(directory, exist_ok=True)
+        return record_id, directory
+
+    def record(self, record_id: str, result: AssessmentResult, **files: Optional[str]) -> Dict[str, Any]:
+        """Append the manifest entry for a record whose files are already written"""
+
+        entry = {
+            "id": record_id,
+            "participant_id": result.participant_id,
+            "assessment_date": result.assessment_date,
+            "age_group": result.age_group,
+            "risk_level": result.risk_level,
+            "files": {kind: os.path.relpath(path, self.results_dir).replace(os.sep, "/")
+                      for kind, path in files.items() if path}
+        }
+        line = (json.dumps(entry) + "\n").encode("utf-8")
+
+        # A single O_APPEND write per entry keeps lines from concurrent writers whole
+        with self._lock:
+            fd = os.open(self.manifest_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+        return entry
+
+    def _refresh(self):
+        """Index manifest lines appended since the last lookup"""
+
+        with self._lock:
+            try:
+                with open(self.manifest_path, "rb") as f:
+                    f.seek(self._offset)
+                    data = f.read()
+            except FileNotFoundError:
+                return
+            end = data.rfind(b"\n") + 1  # leave a line that is still being written
+            for line in data[:end].splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry["id"] not in self._entries:
+                    self._by_participant.setdefault(entry["participant_id"], []).append(entry["id"])
+                self._entries[entry["id"]] = entry
+            self._offset += end
+
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Manifest entries in the order they were saved"""
+        self._refresh()
+        return iter(list(self._entries.values()))
+
+    def get(self, record_id: str) -> Dict[str, Any]:
+        """Manifest entry for one record ID (KeyError if unknown)"""
+        self._refresh()
+        return self._entries[record_id]
+
+    def lookup(self, participant_id: str) -> List[Dict[str, Any]]:
+        """Every manifest entry saved for a participant, oldest first"""
+        self._refresh()
+        return [self._entries[record_id] for record_id in self._by_participant.get(participant_id, [])]
+
+    def path(self, record: Union[str, Dict[str, Any]], kind: str = "results") -> str:
+        """Filesystem path of one of a record's files ("results", "report" or "visualization")"""
+        entry = self.get(record) if isinstance(record, str) else record
+        return os.path.join(self.results_dir, *entry["files"][kind].split("/"))
+
+    def load(self, record: Union[str, Dict[str, Any]]) -> AssessmentResult:
+        """Read a record's saved JSON back into an AssessmentResult"""
+        with open(self.path(record)) as f:
+            return result_from_dict(json.load(f))
+
+_STOP = object()
+
+class BackgroundResultWriter:
+    """
+    Background thread that writes per-participant result files off the caller's path
+    Results wait in a bounded queue (submit() blocks when it is full), are written
+    in batches, and each batch is fsynced together before the next one starts
+    With layout="sharded" files go into a ShardedResultStore and are added to
+    its manifest after the batch is synced
+    Results that fail to save are listed in errors; the thread keeps running
+    """
+
+    def __init__(self, tool: AutismScreeningTool, results_dir: str = "assessment_results",
+                 max_queue: int = 1000, batch_size: int = 64, save_visualization: bool = False,
+                 chart_backend: str = "svg", compact_recommendations: bool = False, fsync: bool = True,
+                 layout: str = "flat"):
+        if layout not in RESULT_LAYOUTS:
+            raise ValueError(f"Unknown results layout: {layout}")
+        self.tool = tool
+        self.results_dir = results_dir
+        self.store = ShardedResultStore(results_dir) if layout == "sharded" else None
+        self.batch_size = max(1, batch_size)
+        self.save_visualization = save_visualization
+        self.chart_backend = chart_backend
+        self.compact_recommendations = compact_recommendations
+        self.fsync = fsync
+
+        self.written = 0
+        self.errors: List[Dict[str, str]] = []
+        self._closed = False
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="assessment-writer", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "BackgroundResultWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def submit(self, result: AssessmentResult, block: bool = True, timeout: Optional[float] = None):
+        """Queue a result for writing; raises queue.Full if it cannot be queued in time"""
+        if self._closed:
+            raise RuntimeError("Writer is closed")
+        if not self._thread.is_alive():
+            raise RuntimeError("Writer thread has stopped")
+        self._queue.put(result, block, timeout)
+
+    def free_slots(self) -> int:
+        """How many more results submit() can queue right now without blocking"""
+        if self._queue.maxsize <= 0:
+            return sys.maxsize
+        return max(0, self._queue.maxsize - self._queue.qsize())
+
+    def flush(self):
+        """Block until everything submitted so far is written and synced"""
+        if not self._thread.is_alive():
+            raise RuntimeError("Writer thread has stopped")
+        self._queue.join()
+
+    def close(self):
+        """Write everything still queued, then stop the background thread"""
+        if not self._closed:
+            self._closed = True
+            if self._thread.is_alive():
+                self._queue.put(_STOP)
+                self._thread.join()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            results = [item for item in batch if item is not _STOP]
+            reported = len(self.errors)
+            try:
+                self._write_batch(results)
+            except Exception as e:
+                # A batch-level failure (directory creation, fsync) fails the
+                # batch's results but must not stop the thread
+                failed = {error["participant_id"] for error in self.errors[reported:]}
+                self.errors.extend({"participant_id": result.participant_id,
+                                    "error": f"{type(e).__name__}: {e}"}
+                                   for result in results if result.participant_id not in failed)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if any(item is _STOP for item in batch):
+                return
+
+    def _write_batch(self, results: List[AssessmentResult]):
+        if not results:
+            return
+        os.makedirs(self.results_dir, exist_ok=True)
+
+        open_files = []
+        directories = {self.results_dir}
+        saved = []
+        try:
+            for result in results:
+                try:
+                    if self.store is not None:
+                        record_id, directory = self.store.allocate()
+                    else:
+                        record_id, directory = result.participant_id, self.results_dir
+                        if any(part in record_id for part in ("/", "\\", "..")) or not record_id:
+                            raise ValueError(f"Participant ID is not a safe file name: {record_id!r}")
+                    directories.add(directory)
+                    json_file = open(f"{directory}/{record_id}_results.json", "w")
+                    open_files.append(json_file)
+                    json.dump(result_to_dict(result, self.compact_recommendations), json_file)
+                    report_file = open(f"{directory}/{record_id}_report.txt", "w")
+                    open_files.append(report_file)
+                    self.tool.write_report(result, report_file)
+                    chart = None
+                    if self.save_visualization:
+                        chart = self.tool.create_visualization(result, directory, self.chart_backend, record_id)
+                    saved.append((record_id, result, json_file.name, report_file.name, chart))
+                except Exception as e:
+                    self.errors.append({"participant_id": result.participant_id,
+                                        "error": f"{type(e).__name__}: {e}"})
+
+            # One sync pass for the whole batch, then the directory entries
+            if self.fsync:
+                for f in open_files:
+                    f.flush()
+                    os.fsync(f.fileno())
+                for path in directories:
+                    try:
+                        directory = os.open(path, os.O_RDONLY)
+                        try:
+                            os.fsync(directory)
+                        finally:
+                            os.close(directory)
+                    except OSError:
+                        pass  # directories cannot be fsynced on every platform
+        finally:
+            for f in open_files:
+                f.close()
+
+        # Only index, hook and count records once their files are durable
+        for record_id, result, results_file, report_file, chart in saved:
+            try:
+                if self.store is not None:
+                    self.store.record(record_id, result, results=results_file, report=report_file,
+                                      visualization=chart)
+                for hook in self.tool.save_hooks:
+                    hook(result)
+                self.written += 1
+            except Exception as e:
+                self.errors.append({"participant_id": result.participant_id,
+                                    "error": f"{type(e).__name__}: {e}"})
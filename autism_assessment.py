@@ -6,14 +6,155 @@ A compassionate AI-powered autism identification and care support system
 Based on established screening tools including M-CHAT-R, ADOS-2, and clinical observations
 """
 
+import argparse
+import bisect
+import concurrent.futures
+import csv
+import itertools
 import json
 import datetime
+import hashlib
+import io
+import math
 import os
-from typing import Dict, List, Tuple, Any
-import matplotlib.pyplot as plt
+import string
+import sys
+from types import MappingProxyType
+from typing import Callable, Dict, List, Tuple, Any, Iterable, Iterator, Mapping, Optional, Sequence, TextIO, Union
 import numpy as np
 from dataclasses import dataclass, asdict
-import seaborn as sns
+
+import assessment_metrics
+from assessment_metrics import instrumented, stage
+
+# Domain order used by the batch scoring engine (7 indicators each)
+DOMAINS = ("social", "behavioral", "communication")
+DOMAIN_WEIGHTS = np.array([0.35, 0.35, 0.30])
+RISK_LEVELS = ("Low", "Low-Moderate", "Moderate", "High")
+AGE_GROUPS = ("toddler", "kid", "teenager", "young", "senior")
+AGE_GROUP_LABELS = np.array(AGE_GROUPS, dtype=object)
+
+# "arithmetic" computes weighted domain means per participant; "lookup" reads them
+# from precomputed DomainScoreTables
+SCORING_MODES = ("arithmetic", "lookup")
+
+# Per-participant file layouts: "flat" (<participant id>_*.* in one directory) or
+# "sharded" (hashed subdirectories indexed by a manifest, see assessment_store)
+RESULT_LAYOUTS = ("flat", "sharded")
+
+# Age-adjusted risk thresholds (younger children may show different patterns).
+# "cutoffs" are the lowest total scores for Low-Moderate, Moderate and High;
+# "confidence" lists the confidence for each level in RISK_LEVELS order.
+# Age groups without their own entry use "default".
+DEFAULT_RISK_THRESHOLDS = {
+    "toddler": {"cutoffs": [1.2, 1.8, 2.5], "confidence": [94.8, 78.1, 85.3, 92.5]},
+    "default": {"cutoffs": [1.3, 2.0, 2.8], "confidence": [96.1, 82.4, 88.7, 95.2]}
+}
+
+# Recommendation text, combined into the precomputed RECOMMENDATION_SETS below
+UNIVERSAL_RECOMMENDATIONS = (
+    "Consider discussing these results with a healthcare professional",
+    "Remember that every individual is unique and has their own strengths"
+)
+RISK_RECOMMENDATIONS = {
+    "Low": (
+        "Continue supporting healthy development",
+        "Stay aware of developmental milestones",
+        "Reassess if new concerns arise in the future"
+    ),
+    "Low-Moderate": (
+        "Continue monitoring development",
+        "Share observations with healthcare providers at routine visits",
+        "Consider environmental supports if helpful",
+        "Reassess if new concerns arise"
+    ),
+    "Moderate": (
+        "Discuss findings with your primary care provider",
+        "Consider a more comprehensive developmental evaluation",
+        "Monitor development and reassess in 3-6 months",
+        "Look into supportive resources and strategies"
+    ),
+    "High": (
+        "Seek evaluation from a qualified autism specialist or developmental pediatrician",
+        "Consider early intervention services if appropriate for age",
+        "Connect with local autism support organizations",
+        "Explore evidence-based therapies and interventions"
+    )
+}
+# Added when the matching domain score is >= 2.0 (DOMAINS order)
+DOMAIN_RECOMMENDATIONS = (
+    "Focus on social skills development and interaction opportunities",
+    "Consider sensory accommodations and routine supports",
+    "Explore speech-language evaluation and support"
+)
+# Indexed by age category: 0 = other, 1 = toddler, 2 = young/senior adults
+AGE_RECOMMENDATIONS = (
+    (),
+    ("Early intervention is most effective during these crucial years",),
+    ("Adult services and supports may be available in your area",)
+)
+DOMAIN_FLAG_THRESHOLD = 2.0
+
+# How each age group's questions refer to "the person"
+QUESTION_SUBJECTS = {
+    "toddler": "your child",
+    "kid": "your child",
+    "teenager": "the teenager",
+    "young": "the individual",
+    "senior": "the individual"
+}
+
+RISK_CODES = {level: code for code, level in enumerate(RISK_LEVELS)}
+
+def _age_category(age_group: str) -> int:
+    """Age category used by the recommendation sets"""
+    if age_group == "toddler":
+        return 1
+    if age_group in ("young", "senior"):
+        return 2
+    return 0
+
+def recommendation_set_id(social_score: float, behavioral_score: float, communication_score: float,
+                          risk_level: str, age_group: str) -> int:
+    """Index into RECOMMENDATION_SETS for one outcome signature
+    
+    The signature is the risk level, the age category and whether each domain
+    score reaches DOMAIN_FLAG_THRESHOLD. Unknown risk levels are treated as Low.
+    """
+    flags = ((social_score >= DOMAIN_FLAG_THRESHOLD)
+             | (behavioral_score >= DOMAIN_FLAG_THRESHOLD) << 1
+             | (communication_score >= DOMAIN_FLAG_THRESHOLD) << 2)
+    return (RISK_CODES.get(risk_level, 0) * len(AGE_RECOMMENDATIONS) + _age_category(age_group)) * 8 + flags
+
+def recommendation_set_ids(social: np.ndarray, behavioral: np.ndarray, communication: np.ndarray,
+                           risk_codes: np.ndarray, age_groups: np.ndarray) -> np.ndarray:
+    """Vectorized recommendation_set_id for arrays of outcomes"""
+    age_groups = np.asarray(age_groups)
+    age_categories = np.where(age_groups == "toddler", 1,
+                              np.where(np.isin(age_groups, ["young", "senior"]), 2, 0))
+    flags = ((np.asarray(social) >= DOMAIN_FLAG_THRESHOLD).astype(np.int16)
+             | (np.asarray(behavioral) >= DOMAIN_FLAG_THRESHOLD).astype(np.int16) << 1
+             | (np.asarray(communication) >= DOMAIN_FLAG_THRESHOLD).astype(np.int16) << 2)
+    return ((np.asarray(risk_codes, dtype=np.int16) * len(AGE_RECOMMENDATIONS) + age_categories) * 8
+            + flags).astype(np.int16)
+
+def _build_recommendation_sets() -> Tuple[Tuple[str, ...], ...]:
+    """Precompute every distinct recommendation list as an interned tuple"""
+    sets = []
+    for risk_level in RISK_LEVELS:
+        for age_recommendations in AGE_RECOMMENDATIONS:
+            for flags in range(8):
+                recommendations = (
+                    UNIVERSAL_RECOMMENDATIONS
+                    + RISK_RECOMMENDATIONS[risk_level]
+                    + tuple(text for bit, text in enumerate(DOMAIN_RECOMMENDATIONS) if flags >> bit & 1)
+                    + age_recommendations
+                )
+                sets.append(tuple(sys.intern(text) for text in recommendations))
+    return tuple(sets)
+
+# Every possible recommendation list, indexed by recommendation_set_id()
+RECOMMENDATION_SETS = _build_recommendation_sets()
 
 @dataclass
 class AssessmentResult:
@@ -24,8 +165,670 @@ class AssessmentResult:
     scores: Dict[str, float]
     total_score: float
     risk_level: str
-    recommendations: List[str]
+    recommendations: Sequence[str]
     confidence: float
+    recommendation_set_id: Optional[int] = None
+
+def result_to_dict(result: AssessmentResult, compact_recommendations: bool = False) -> Dict[str, Any]:
+    """JSON-ready dict for a result, optionally storing only the recommendation-set ID"""
+    data = asdict(result)
+    if compact_recommendations and result.recommendation_set_id is not None:
+        del data["recommendations"]
+    return data
+
+def result_from_dict(data: Dict[str, Any]) -> AssessmentResult:
+    """Rebuild an AssessmentResult from result_to_dict output (full or compact)"""
+    data = dict(data)
+    if "recommendations" not in data:
+        data["recommendations"] = RECOMMENDATION_SETS[data["recommendation_set_id"]]
+    return AssessmentResult(**data)
+
+@dataclass
+class BatchScores:
+    """Vectorized scores for N participants (one array entry per row)"""
+    age_groups: np.ndarray
+    social: np.ndarray
+    behavioral: np.ndarray
+    communication: np.ndarray
+    total: np.ndarray
+    risk_codes: np.ndarray
+    risk_levels: np.ndarray
+    confidence: np.ndarray
+    recommendation_set_ids: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.total)
+
+class RiskThresholdTable:
+    """Table-driven risk classification with one threshold set per age group"""
+    
+    def __init__(self, thresholds: Optional[Mapping[str, Mapping[str, Sequence[float]]]] = None):
+        thresholds = thresholds or DEFAULT_RISK_THRESHOLDS
+        if "default" not in thresholds:
+            raise ValueError("Risk thresholds need a 'default' entry")
+        
+        self.cutoffs = {}
+        self.confidence = {}
+        for age_group, entry in thresholds.items():
+            cutoffs = np.asarray(entry["cutoffs"], dtype=np.float64)
+            confidence = np.asarray(entry["confidence"], dtype=np.float64)
+            if cutoffs.shape != (len(RISK_LEVELS) - 1,) or np.any(np.diff(cutoffs) < 0):
+                raise ValueError(f"'{age_group}' needs {len(RISK_LEVELS) - 1} ascending cutoffs")
+            if confidence.shape != (len(RISK_LEVELS),):
+                raise ValueError(f"'{age_group}' needs one confidence per risk level")
+            self.cutoffs[age_group] = cutoffs
+            self.confidence[age_group] = confidence
+        
+        # Plain-list copies for the scalar bisect path
+        self._cutoff_lists = {group: cutoffs.tolist() for group, cutoffs in self.cutoffs.items()}
+        self._confidence_lists = {group: values.tolist() for group, values in self.confidence.items()}
+        self._labels = np.array(RISK_LEVELS, dtype=object)
+    
+    @classmethod
+    def from_file(cls, path: str) -> "RiskThresholdTable":
+        """Load a threshold set from a JSON or TOML configuration file"""
+        
+        if path.lower().endswith(".toml"):
+            import tomllib
+            with open(path, "rb") as f:
+                return cls(tomllib.load(f))
+        with open(path) as f:
+            return cls(json.load(f))
+    
+    def _group(self, age_group: str) -> str:
+        return age_group if age_group in self.cutoffs else "default"
+    
+    def classify_one(self, total_score: float, age_group: str) -> Tuple[str, float]:
+        """Risk level and confidence for a single score"""
+        
+        group = self._group(age_group)
+        code = bisect.bisect_right(self._cutoff_lists[group], total_score)
+        return RISK_LEVELS[code], self._confidence_lists[group][code]
+    
+    def classify(self, total_scores: np.ndarray,
+                 age_groups: Union[str, Sequence[str], np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Classify an array of total scores
+        
+        Returns risk codes (indexes into RISK_LEVELS), risk labels and confidence
+        values as arrays. ``age_groups`` is a single group or one per score.
+        """
+        
+        total_scores = np.asarray(total_scores, dtype=np.float64)
+        if isinstance(age_groups, str):
+            age_groups = np.full(total_scores.shape, age_groups, dtype=object)
+        age_groups = np.asarray(age_groups)
+        
+        codes = np.zeros(total_scores.shape, dtype=np.int8)
+        confidence = np.zeros(total_scores.shape, dtype=np.float64)
+        for age_group in np.unique(age_groups) if age_groups.size else ():
+            mask = age_groups == age_group
+            group = self._group(age_group)
+            group_codes = np.searchsorted(self.cutoffs[group], total_scores[mask], side="right")
+            codes[mask] = group_codes
+            confidence[mask] = self.confidence[group][group_codes]
+        
+        return codes, self._labels[codes], confidence
+
+class ResponseNoiseModel:
+    """
+    Response-noise model for Monte Carlo score intervals
+    Each rating independently moves by ``shift`` points with the given
+    probability (clipped to the 0-4 scale) and otherwise stays as answered.
+    """
+    
+    def __init__(self, shift_probabilities: Mapping[int, float]):
+        shifts = {int(shift): float(probability) for shift, probability in shift_probabilities.items()}
+        if any(probability < 0 for probability in shifts.values()):
+            raise ValueError("Shift probabilities cannot be negative")
+        unchanged = 1.0 - sum(probability for shift, probability in shifts.items() if shift != 0)
+        if unchanged < -1e-9:
+            raise ValueError("Shift probabilities add up to more than 1")
+        shifts[0] = max(unchanged, 0.0)
+        
+        self.shift_probabilities = dict(sorted(shifts.items()))
+        self.move_probability = 1.0 - shifts[0]
+        # Non-zero shifts and their probabilities given that a rating moves
+        moves = {shift: probability for shift, probability in self.shift_probabilities.items()
+                 if shift != 0 and probability > 0}
+        self.moves = np.array(list(moves), dtype=np.int8)
+        self._move_edges = np.cumsum(list(moves.values()))[:-1] / max(self.move_probability, 1e-300)
+    
+    @classmethod
+    def symmetric(cls, probability: float = 0.1, max_shift: int = 1) -> "ResponseNoiseModel":
+        """Move each rating with ``probability``, split evenly over +/-1 .. +/-max_shift"""
+        
+        if not 0 <= probability <= 1 or max_shift < 1:
+            raise ValueError("Need 0 <= probability <= 1 and max_shift >= 1")
+        share = probability / (2 * max_shift)
+        return cls({shift: share for step in range(1, max_shift + 1) for shift in (-step, step)})
+    
+    def sample_moves(self, rng: np.random.Generator, cells: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions (ascending, out of ``cells`` ratings) that move, and their shifts
+        
+        Only moved ratings are drawn: the gaps between them are geometric, so
+        the cost follows the number of moves rather than the number of ratings
+        (models that move most ratings draw one uniform per rating instead).
+        """
+        
+        if self.move_probability <= 0 or cells == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int8)
+        if self.move_probability > 0.25:
+            positions = np.flatnonzero(rng.random(cells, dtype=np.float32) < self.move_probability)
+            shifts = self.moves[np.searchsorted(self._move_edges, rng.random(len(positions)), side="right")]
+            return positions, shifts
+        
+        expected = cells * self.move_probability
+        parts, last = [], -1
+        while last < cells - 1:
+            gaps = rng.geometric(self.move_probability, int(expected + 6 * np.sqrt(expected) + 16))
+            positions = last + np.cumsum(gaps)
+            last = int(positions[-1])
+            parts.append(positions[positions < cells])
+            expected = (cells - 1 - last) * self.move_probability
+        positions = np.concatenate(parts)
+        
+        shifts = self.moves[np.searchsorted(self._move_edges, rng.random(len(positions)), side="right")]
+        return positions, shifts
+
+DEFAULT_NOISE_MODEL = ResponseNoiseModel.symmetric(0.1)
+
+@dataclass
+class ScoreUncertainty:
+    """Monte Carlo total-score intervals and risk-level probabilities for N participants"""
+    total_mean: np.ndarray
+    total_lower: np.ndarray
+    total_upper: np.ndarray
+    risk_probabilities: np.ndarray      # (N x len(RISK_LEVELS))
+    draws: int
+    interval: float
+    
+    def __len__(self) -> int:
+        return len(self.total_mean)
+    
+    def to_dict(self, index: int) -> Dict[str, Any]:
+        """JSON-ready summary for one participant"""
+        return {
+            "draws": self.draws,
+            "interval": self.interval,
+            "total_score_mean": round(float(self.total_mean[index]), 3),
+            "total_score_lower": round(float(self.total_lower[index]), 3),
+            "total_score_upper": round(float(self.total_upper[index]), 3),
+            "risk_probabilities": {level: round(float(probability), 4) for level, probability
+                                   in zip(RISK_LEVELS, self.risk_probabilities[index])}
+        }
+
+# Built-in instrument: the 21 key indicators across the 3 evidence methods, in
+# DOMAINS order. Questions say "the person"; get_age_specific_questions adapts them.
+DEFAULT_INDICATORS = {
+    # Method 1: Social Communication & Interaction (7 indicators)
+    "social": {
+        "eye_contact": {
+            "question": "Does the person make appropriate eye contact during conversations?",
+            "weight": 0.85,
+            "reverse_scored": True
+        },
+        "social_smiling": {
+            "question": "Does the person smile back when you smile at them?",
+            "weight": 0.80,
+            "reverse_scored": True
+        },
+        "pointing": {
+            "question": "Does the person point to show you something interesting?",
+            "weight": 0.90,
+            "reverse_scored": True
+        },
+        "joint_attention": {
+            "question": "When you point at something, does the person look where you're pointing?",
+            "weight": 0.88,
+            "reverse_scored": True
+        },
+        "imitation": {
+            "question": "Does the person copy your actions or gestures?",
+            "weight": 0.75,
+            "reverse_scored": True
+        },
+        "social_play": {
+            "question": "Does the person enjoy playing social games like peek-a-boo?",
+            "weight": 0.82,
+            "reverse_scored": True
+        },
+        "emotional_sharing": {
+            "question": "Does the person share emotions appropriately (joy, excitement, etc.)?",
+            "weight": 0.87,
+            "reverse_scored": True
+        }
+    },
+    
+    # Method 2: Restricted & Repetitive Behaviors (7 indicators)
+    "behavioral": {
+        "repetitive_movements": {
+            "question": "Does the person engage in repetitive movements (hand flapping, rocking)?",
+            "weight": 0.78,
+            "reverse_scored": False
+        },
+        "routine_adherence": {
+            "question": "Does the person become upset with changes in routine?",
+            "weight": 0.85,
+            "reverse_scored": False
+        },
+        "special_interests": {
+            "question": "Does the person have intense, narrow interests?",
+            "weight": 0.70,
+            "reverse_scored": False
+        },
+        "sensory_sensitivity": {
+            "question": "Is the person over- or under-sensitive to sounds, textures, or lights?",
+            "weight": 0.83,
+            "reverse_scored": False
+        },
+        "object_fixation": {
+            "question": "Does the person focus intensely on parts of objects rather than whole objects?",
+            "weight": 0.77,
+            "reverse_scored": False
+        },
+        "repetitive_speech": {
+            "question": "Does the person repeat words or phrases (echolalia)?",
+            "weight": 0.80,
+            "reverse_scored": False
+        },
+        "rigid_thinking": {
+            "question": "Does the person have difficulty with flexible thinking?",
+            "weight": 0.75,
+            "reverse_scored": False
+        }
+    },
+    
+    # Method 3: Communication & Language (7 indicators)
+    "communication": {
+        "language_delay": {
+            "question": "Are there concerns about language development or usage?",
+            "weight": 0.90,
+            "reverse_scored": False
+        },
+        "nonverbal_communication": {
+            "question": "Does the person use gestures and facial expressions to communicate?",
+            "weight": 0.85,
+            "reverse_scored": True
+        },
+        "conversation_skills": {
+            "question": "Can the person engage in back-and-forth conversation?",
+            "weight": 0.88,
+            "reverse_scored": True
+        },
+        "literal_understanding": {
+            "question": "Does the person often take things very literally?",
+            "weight": 0.72,
+            "reverse_scored": False
+        },
+        "pretend_play": {
+            "question": "Does the person engage in imaginative or pretend play?",
+            "weight": 0.83,
+            "reverse_scored": True
+        },
+        "name_response": {
+            "question": "Does the person respond when their name is called?",
+            "weight": 0.92,
+            "reverse_scored": True
+        },
+        "prosody": {
+            "question": "Does the person's speech have unusual rhythm, pitch, or tone?",
+            "weight": 0.76,
+            "reverse_scored": False
+        }
+    }
+}
+
+class Instrument:
+    """
+    Compiled, immutable indicator definitions for one instrument version
+    Holds the read-only indicator catalog of each domain plus the packed arrays
+    used for scoring. Each distinct definition is compiled once per process,
+    keyed by a hash of its content, and shared by every tool that uses it, so
+    several instrument versions can be scored side by side.
+    """
+    
+    # Compiled instruments keyed by content hash
+    _compiled: Dict[str, "Instrument"] = {}
+    
+    def __init__(self, definition: Mapping[str, Any], key: str):
+        self.key = key
+        self.name = definition["name"]
+        self.version = definition["version"]
+        self._definition = definition
+        
+        self.domains = MappingProxyType({
+            method_key: MappingProxyType({
+                indicator: MappingProxyType(dict(data)) for indicator, data in indicators.items()
+            })
+            for method_key, indicators in definition["domains"].items()
+        })
+        self.all_indicators = MappingProxyType({
+            indicator: data for indicators in self.domains.values() for indicator, data in indicators.items()
+        })
+        self.indicator_order = tuple(self.all_indicators)
+        
+        # Packed scoring arrays (read-only, shared between tools)
+        self.indicator_weights = np.array([data["weight"] for data in self.all_indicators.values()],
+                                          dtype=np.float64)
+        self.reverse_mask = np.array([data["reverse_scored"] for data in self.all_indicators.values()],
+                                     dtype=bool)
+        self.indicator_weights.flags.writeable = False
+        self.reverse_mask.flags.writeable = False
+        
+        # Column slices of each domain within the (N x indicators) response matrix
+        slices = {}
+        start = 0
+        for method_key in DOMAINS:
+            slices[method_key] = slice(start, start + len(self.domains[method_key]))
+            start += len(self.domains[method_key])
+        self.domain_slices = MappingProxyType(slices)
+    
+    @classmethod
+    def compile(cls, definition: Mapping[str, Any]) -> "Instrument":
+        """Validate and compile a definition, reusing an earlier compile of the same content
+        
+        ``definition`` is ``{"name": ..., "version": ..., "domains": {...}}`` or just
+        the domains mapping: each of DOMAINS maps indicator names to their
+        ``question``, ``weight`` and optional ``reverse_scored`` flag.
+        """
+        
+        metadata = definition if "domains" in definition else {}
+        domains = metadata.get("domains", definition)
+        if set(domains) != set(DOMAINS):
+            raise ValueError(f"An instrument must define exactly the domains: {', '.join(DOMAINS)}")
+        
+        normalized = {
+            "name": str(metadata.get("name", "custom")),
+            "version": str(metadata.get("version", "")),
+            "domains": {}
+        }
+        seen = set()
+        for method_key in DOMAINS:
+            if not domains[method_key]:
+                raise ValueError(f"Domain '{method_key}' has no indicators")
+            normalized["domains"][method_key] = {}
+            for indicator, data in domains[method_key].items():
+                if indicator in seen:
+                    raise ValueError(f"Indicator '{indicator}' is defined more than once")
+                seen.add(indicator)
+                if not isinstance(data.get("question"), str):
+                    raise ValueError(f"Indicator '{indicator}' needs a question")
+                weight = float(data.get("weight", 0))
+                if not weight > 0:
+                    raise ValueError(f"Indicator '{indicator}' needs a positive weight")
+                reverse_scored = data.get("reverse_scored", False)
+                if not isinstance(reverse_scored, bool):
+                    raise ValueError(f"Indicator '{indicator}': reverse_scored must be true or false")
+                normalized["domains"][method_key][indicator] = {
+                    "question": data["question"],
+                    "weight": weight,
+                    "reverse_scored": reverse_scored
+                }
+        
+        # Indicator order is significant (it fixes the response columns), so keys are not sorted
+        key = hashlib.sha256(json.dumps(normalized).encode("utf-8")).hexdigest()[:16]
+        instrument = cls._compiled.get(key)
+        if instrument is None:
+            instrument = cls._compiled[key] = cls(normalized, key)
+        return instrument
+    
+    @classmethod
+    def from_file(cls, path: str) -> "Instrument":
+        """Load indicator definitions from a JSON or TOML file"""
+        
+        if path.lower().endswith(".toml"):
+            import tomllib
+            with open(path, "rb") as f:
+                return cls.compile(tomllib.load(f))
+        with open(path) as f:
+            return cls.compile(json.load(f))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain definition (the format accepted by compile and from_file)"""
+        return json.loads(json.dumps(self._definition))
+    
+    def __len__(self) -> int:
+        return len(self.indicator_order)
+
+DEFAULT_INSTRUMENT = Instrument.compile({"name": "default", "version": "1", "domains": DEFAULT_INDICATORS})
+
+def domain_means(weighted: np.ndarray, domain_slices: Mapping[str, slice]) -> np.ndarray:
+    """(N x domains) mean of each domain's weighted answers
+    
+    Columns are summed left to right, so the result does not depend on the
+    array layout (NumPy's pairwise summation can differ between a strided view
+    and a contiguous copy once a domain has 8 or more indicators).
+    """
+    
+    means = np.empty((weighted.shape[0], len(domain_slices)))
+    for column, domain_slice in enumerate(domain_slices.values()):
+        total = weighted[:, domain_slice.start].copy()
+        for index in range(domain_slice.start + 1, domain_slice.stop):
+            total += weighted[:, index]
+        means[:, column] = total / (domain_slice.stop - domain_slice.start)
+    return means
+
+def weighted_total(domain_scores: np.ndarray) -> np.ndarray:
+    """Total score from (N x 3) domain scores
+    
+    Evaluated term by term as social * 0.35 + behavioral * 0.35 +
+    communication * 0.30, the order the per-participant scorer always used,
+    so totals sitting on a risk cutoff classify exactly as before.
+    """
+    
+    return (domain_scores[:, 0] * DOMAIN_WEIGHTS[0] + domain_scores[:, 1] * DOMAIN_WEIGHTS[1]
+            + domain_scores[:, 2] * DOMAIN_WEIGHTS[2])
+
+class DomainScoreTables:
+    """
+    Weighted domain mean for every possible answer vector of each domain
+    A domain of k indicators rated 0-4 has 5^k answer vectors (78,125 for 7),
+    so scoring reduces to one integer index and one lookup per domain. Tables
+    are cached as .npy files keyed by a hash of the weights and reverse flags,
+    and shared by every tool in the process.
+    """
+    
+    RATING_LEVELS = 5
+    MAX_DOMAIN_SIZE = 9  # 5^9 entries = 15 MB per table
+    
+    # Loaded tables keyed by definition hash
+    _loaded: Dict[str, "DomainScoreTables"] = {}
+    
+    def __init__(self, tables: Mapping[str, np.ndarray], domain_slices: Mapping[str, slice]):
+        self.tables = dict(tables)
+        self.domain_slices = dict(domain_slices)
+        self.powers = {
+            method_key: self.RATING_LEVELS ** np.arange(
+                domain_slice.stop - domain_slice.start - 1, -1, -1, dtype=np.int64
+            )
+            for method_key, domain_slice in self.domain_slices.items()
+        }
+    
+    @staticmethod
+    def definition_key(weights: np.ndarray, reverse_mask: np.ndarray,
+                       domain_slices: Mapping[str, slice]) -> str:
+        """Stable hash of everything the tables depend on"""
+        
+        definition = json.dumps({
+            "weights": [float(weight) for weight in weights],
+            "reverse": [bool(flag) for flag in reverse_mask],
+            "domains": [[key, s.start, s.stop] for key, s in domain_slices.items()]
+        }, sort_keys=True)
+        return hashlib.sha256(definition.encode("utf-8")).hexdigest()[:16]
+    
+    @classmethod
+    def build_table(cls, weights: np.ndarray, reverse_mask: np.ndarray) -> np.ndarray:
+        """Weighted mean of every answer vector, indexed by its base-5 digits"""
+        
+        size = len(weights)
+        if size > cls.MAX_DOMAIN_SIZE:
+            raise ValueError(f"Domains of more than {cls.MAX_DOMAIN_SIZE} indicators are too large to tabulate")
+        answers = np.indices((cls.RATING_LEVELS,) * size).reshape(size, -1).T
+        # Same arithmetic as the batch scorer, so both give bit-identical scores
+        weighted = np.where(reverse_mask, 4 - answers, answers) * weights
+        return domain_means(weighted, {"domain": slice(0, size)})[:, 0]
+    
+    @classmethod
+    def for_tool(cls, tool: "AutismScreeningTool", cache_dir: Optional[str] = None) -> "DomainScoreTables":
+        """Tables for a tool's indicator definitions, from memory, the disk cache or built fresh"""
+        
+        key = cls.definition_key(tool.indicator_weights, tool.reverse_mask, tool.domain_slices)
+        tables = cls._loaded.get(key)
+        if tables is not None:
+            return tables
+        
+        cache_dir = cache_dir or os.path.join(os.path.expanduser("~"), ".cache", "understanding_together")
+        domain_tables = {}
+        for method_key, domain_slice in tool.domain_slices.items():
+            path = os.path.join(cache_dir, f"domain_scores_{key}_{method_key}.npy")
+            expected = cls.RATING_LEVELS ** (domain_slice.stop - domain_slice.start)
+            try:
+                table = np.load(path)
+                if table.shape != (expected,):
+                    raise ValueError(f"{path} has shape {table.shape}")
+            except (OSError, ValueError):
+                table = cls.build_table(tool.indicator_weights[domain_slice], tool.reverse_mask[domain_slice])
+                try:
+                    os.makedirs(cache_dir, exist_ok=True)
+                    temporary = f"{path}.{os.getpid()}.tmp"
+                    with open(temporary, "wb") as f:
+                        np.save(f, table)
+                    os.replace(temporary, path)
+                except OSError:
+                    pass  # an unwritable cache only costs a rebuild next time
+            domain_tables[method_key] = table
+        
+        tables = cls._loaded[key] = cls(domain_tables, tool.domain_slices)
+        return tables
+    
+    def domain_scores(self, responses: np.ndarray) -> np.ndarray:
+        """(N x domains) weighted domain means for an (N x indicators) matrix of 0-4 ratings"""
+        
+        responses = np.asarray(responses, dtype=np.int64)
+        return np.column_stack([
+            self.tables[method_key][responses[:, domain_slice] @ self.powers[method_key]]
+            for method_key, domain_slice in self.domain_slices.items()
+        ]) if len(responses) else np.zeros((0, len(self.tables)))
+
+# Static fields ({rule}, {line}) are folded into the text once when the
+# template is compiled; the rest are filled from each AssessmentResult
+REPORT_TEMPLATE = """
+{rule}
+🤝 UNDERSTANDING TOGETHER - ASSESSMENT REPORT
+{rule}
+
+PARTICIPANT INFORMATION
+Participant ID: {participant_id}
+Age Group: {age_group}
+Assessment Date: {assessment_date}
+Assessment Confidence: {confidence}%
+
+ASSESSMENT RESULTS
+{line}
+Total Score: {total_score}/4.0
+Risk Level: {risk_level}
+
+DOMAIN SCORES
+{line}
+Social Communication & Interaction: {social_communication}/4.0
+Restricted & Repetitive Behaviors: {behavioral_patterns}/4.0  
+Communication & Language: {communication_language}/4.0
+
+UNDERSTANDING YOUR RESULTS
+{line}
+This assessment provides insights based on established autism screening tools.
+The results indicate areas that may benefit from further evaluation or support.
+
+• Scores closer to 0 suggest fewer autism-related characteristics
+• Scores closer to 4 suggest more autism-related characteristics  
+• Higher confidence indicates more reliable results
+
+RECOMMENDATIONS
+{line}{recommendations}
+
+IMPORTANT NOTES
+{line}
+• This tool is for screening purposes only and is not diagnostic
+• Results should be interpreted by qualified professionals
+• Every individual is unique with their own strengths and challenges
+• Early identification can lead to better support and outcomes
+• You are not alone - support and resources are available
+
+NEXT STEPS
+{line}
+1. Save this report for your records
+2. Share results with healthcare providers
+3. Connect with autism support organizations if helpful
+4. Remember that assessment is just the beginning of understanding
+
+For support and resources, visit: autismspeaks.org | autism-society.org
+
+Generated by Understanding Together Assessment Tool v1.0
+Confidence Level: {confidence}% | Reliability: 98.5%
+{rule}
+"""
+
+class ReportTemplate:
+    """Report template compiled once into static text segments and result fields"""
+    
+    STATIC_FIELDS = {"rule": "=" * 80, "line": "─" * 40}
+    
+    def __init__(self, template: str = REPORT_TEMPLATE):
+        self.parts = []
+        literal = ""
+        for text, field, _, _ in string.Formatter().parse(template):
+            literal += text
+            if field is None:
+                continue
+            if field in self.STATIC_FIELDS:
+                literal += self.STATIC_FIELDS[field]
+            else:
+                self.parts.append((literal, field))
+                literal = ""
+        self.tail = literal
+        
+        # Rendered recommendation blocks, keyed by recommendation_set_id
+        self._recommendation_blocks: Dict[int, str] = {}
+    
+    def _recommendation_block(self, result: AssessmentResult) -> str:
+        set_id = result.recommendation_set_id
+        shared = set_id is not None and result.recommendations is RECOMMENDATION_SETS[set_id]
+        if shared and set_id in self._recommendation_blocks:
+            return self._recommendation_blocks[set_id]
+        
+        block = "".join(f"\n{i}. {recommendation}"
+                        for i, recommendation in enumerate(result.recommendations, 1))
+        if shared:
+            self._recommendation_blocks[set_id] = block
+        return block
+    
+    def render_to(self, result: AssessmentResult, output: TextIO):
+        """Write the report for ``result`` into ``output``"""
+        
+        values = {
+            "participant_id": result.participant_id,
+            "age_group": result.age_group.title(),
+            "assessment_date": result.assessment_date,
+            "confidence": f"{result.confidence}",
+            "total_score": f"{result.total_score}",
+            "risk_level": result.risk_level,
+            "social_communication": f"{result.scores['social_communication']}",
+            "behavioral_patterns": f"{result.scores['behavioral_patterns']}",
+            "communication_language": f"{result.scores['communication_language']}",
+            "recommendations": self._recommendation_block(result)
+        }
+        for literal, field in self.parts:
+            output.write(literal)
+            output.write(values[field])
+        output.write(self.tail)
+    
+    def render(self, result: AssessmentResult) -> str:
+        buffer = io.StringIO()
+        self.render_to(result, buffer)
+        return buffer.getvalue()
+
+# Shared by every tool in the process
+COMPILED_REPORT = ReportTemplate()
 
 class AutismScreeningTool:
     """
@@ -33,8 +836,27 @@ class AutismScreeningTool:
     Implements 21 key indicators across 3 evidence-based methods
     """
     
-    def __init__(self):
-        self.setup_assessment_data()
+    # Shared question catalogs keyed by (indicator definitions, age group)
+    _question_catalogs: Dict[Tuple[str, str], Mapping[str, Mapping[str, Any]]] = {}
+    
+    def __init__(self, risk_thresholds: Optional[Union[RiskThresholdTable, Mapping[str, Any]]] = None,
+                 scoring: str = "arithmetic", table_cache_dir: Optional[str] = None,
+                 instrument: Optional[Union[Instrument, Mapping[str, Any], str]] = None):
+        if scoring not in SCORING_MODES:
+            raise ValueError(f"Unknown scoring mode: {scoring}")
+        if not isinstance(risk_thresholds, RiskThresholdTable):
+            risk_thresholds = RiskThresholdTable(risk_thresholds)
+        self.risk_thresholds = risk_thresholds
+        # Called with each result after save_results() has stored it
+        self.save_hooks: List[Callable[[AssessmentResult], None]] = []
+        # Indicator definitions: a compiled Instrument, a definition mapping or a JSON/TOML path
+        if isinstance(instrument, str):
+            instrument = Instrument.from_file(instrument)
+        elif instrument is not None and not isinstance(instrument, Instrument):
+            instrument = Instrument.compile(instrument)
+        self.setup_assessment_data(instrument)
+        # Precomputed domain scores, used by score_batch in "lookup" mode
+        self.score_tables = DomainScoreTables.for_tool(self, table_cache_dir) if scoring == "lookup" else None
         self.age_groups = {
             "toddler": (16, 30),      # 16-30 months
             "kid": (31, 72),          # 2.5-6 years  
@@ -42,166 +864,88 @@ class AutismScreeningTool:
             "young": (216, 359),       # 18-30 years
             "senior": (360, 999)       # 30+ years
         }
+        self.compile_age_bounds()
         
-    def setup_assessment_data(self):
-        """Initialize the 21 key indicators across 3 evidence methods"""
+    def setup_assessment_data(self, instrument: Optional[Instrument] = None):
+        """Attach the compiled indicator definitions (the 21 key indicators by default)"""
         
-        # Method 1: Social Communication & Interaction (7 indicators)
-        self.social_indicators = {
-            "eye_contact": {
-                "question": "Does the person make appropriate eye contact during conversations?",
-                "weight": 0.85,
-                "reverse_scored": True
-            },
-            "social_smiling": {
-                "question": "Does the person smile back when you smile at them?",
-                "weight": 0.80,
-                "reverse_scored": True
-            },
-            "pointing": {
-                "question": "Does the person point to show you something interesting?",
-                "weight": 0.90,
-                "reverse_scored": True
-            },
-            "joint_attention": {
-                "question": "When you point at something, does the person look where you're pointing?",
-                "weight": 0.88,
-                "reverse_scored": True
-            },
-            "imitation": {
-                "question": "Does the person copy your actions or gestures?",
-                "weight": 0.75,
-                "reverse_scored": True
-            },
-            "social_play": {
-                "question": "Does the person enjoy playing social games like peek-a-boo?",
-                "weight": 0.82,
-                "reverse_scored": True
-            },
-            "emotional_sharing": {
-                "question": "Does the person share emotions appropriately (joy, excitement, etc.)?",
-                "weight": 0.87,
-                "reverse_scored": True
-            }
-        }
+        self.instrument = instrument or DEFAULT_INSTRUMENT
         
-        # Method 2: Restricted & Repetitive Behaviors (7 indicators)
-        self.behavioral_indicators = {
-            "repetitive_movements": {
-                "question": "Does the person engage in repetitive movements (hand flapping, rocking)?",
-                "weight": 0.78,
-                "reverse_scored": False
-            },
-            "routine_adherence": {
-                "question": "Does the person become upset with changes in routine?",
-                "weight": 0.85,
-                "reverse_scored": False
-            },
-            "special_interests": {
-                "question": "Does the person have intense, narrow interests?",
-                "weight": 0.70,
-                "reverse_scored": False
-            },
-            "sensory_sensitivity": {
-                "question": "Is the person over- or under-sensitive to sounds, textures, or lights?",
-                "weight": 0.83,
-                "reverse_scored": False
-            },
-            "object_fixation": {
-                "question": "Does the person focus intensely on parts of objects rather than whole objects?",
-                "weight": 0.77,
-                "reverse_scored": False
-            },
-            "repetitive_speech": {
-                "question": "Does the person repeat words or phrases (echolalia)?",
-                "weight": 0.80,
-                "reverse_scored": False
-            },
-            "rigid_thinking": {
-                "question": "Does the person have difficulty with flexible thinking?",
-                "weight": 0.75,
-                "reverse_scored": False
-            }
-        }
+        # Read-only views of the three evidence methods and of all indicators combined
+        self.social_indicators = self.instrument.domains["social"]
+        self.behavioral_indicators = self.instrument.domains["behavioral"]
+        self.communication_indicators = self.instrument.domains["communication"]
+        self.all_indicators = self.instrument.all_indicators
         
-        # Method 3: Communication & Language (7 indicators)
-        self.communication_indicators = {
-            "language_delay": {
-                "question": "Are there concerns about language development or usage?",
-                "weight": 0.90,
-                "reverse_scored": False
-            },
-            "nonverbal_communication": {
-                "question": "Does the person use gestures and facial expressions to communicate?",
-                "weight": 0.85,
-                "reverse_scored": True
-            },
-            "conversation_skills": {
-                "question": "Can the person engage in back-and-forth conversation?",
-                "weight": 0.88,
-                "reverse_scored": True
-            },
-            "literal_understanding": {
-                "question": "Does the person often take things very literally?",
-                "weight": 0.72,
-                "reverse_scored": False
-            },
-            "pretend_play": {
-                "question": "Does the person engage in imaginative or pretend play?",
-                "weight": 0.83,
-                "reverse_scored": True
-            },
-            "name_response": {
-                "question": "Does the person respond when their name is called?",
-                "weight": 0.92,
-                "reverse_scored": True
-            },
-            "prosody": {
-                "question": "Does the person's speech have unusual rhythm, pitch, or tone?",
-                "weight": 0.76,
-                "reverse_scored": False
-            }
-        }
+        # Packed arrays for batch scoring, shared with every tool using this instrument
+        self.indicator_order = self.instrument.indicator_order
+        self.catalog_key = self.instrument.key
+        self.indicator_weights = self.instrument.indicator_weights
+        self.reverse_mask = self.instrument.reverse_mask
+        self.domain_slices = self.instrument.domain_slices
         
-        # Combine all indicators
-        self.all_indicators = {
-            **self.social_indicators,
-            **self.behavioral_indicators, 
-            **self.communication_indicators
-        }
+    def compile_age_bounds(self):
+        """Sort the age_groups ranges for bisect lookups (call again after editing age_groups)"""
+        
+        ranges = sorted((min_age, max_age, group) for group, (min_age, max_age) in self.age_groups.items())
+        self._age_lows = [min_age for min_age, _, _ in ranges]
+        self._age_highs = [max_age for _, max_age, _ in ranges]
+        self._age_range_groups = [group for _, _, group in ranges]
+        # Array copies for age_group_codes
+        self._age_low_array = np.array(self._age_lows)
+        self._age_high_array = np.array(self._age_highs)
+        self._age_range_codes = np.array([AGE_GROUPS.index(group) for group in self._age_range_groups],
+                                         dtype=np.int8)
         
     def determine_age_group(self, age_months: int) -> str:
         """Determine age group based on age in months"""
-        for group, (min_age, max_age) in self.age_groups.items():
-            if min_age <= age_months <= max_age:
-                return group
-        return "senior"  # Default for very high ages
+        index = bisect.bisect_right(self._age_lows, age_months) - 1
+        if index >= 0 and age_months <= self._age_highs[index]:
+            return self._age_range_groups[index]
+        return "senior"  # Default for ages outside every range
     
-    def get_age_specific_questions(self, age_group: str) -> Dict[str, Dict]:
-        """Adapt questions based on age group"""
-        adapted_questions = {}
+    def age_group_codes(self, age_months: Union[int, Sequence[int], np.ndarray]) -> np.ndarray:
+        """Vectorized determine_age_group: indexes into AGE_GROUPS for an array of ages"""
         
+        ages = np.asarray(age_months).astype(np.int64)
+        index = np.searchsorted(self._age_low_array, ages, side="right") - 1
+        clipped = np.maximum(index, 0)
+        inside = (index >= 0) & (ages <= self._age_high_array[clipped])
+        return np.where(inside, self._age_range_codes[clipped], AGE_GROUPS.index("senior")).astype(np.int8)
+    
+    def get_age_specific_questions(self, age_group: str) -> Mapping[str, Mapping[str, Any]]:
+        """Adapt questions based on age group
+        
+        The adapted catalog is built once per process for each age group and
+        shared read-only by every caller.
+        """
+        
+        key = (self.catalog_key, age_group)
+        catalog = AutismScreeningTool._question_catalogs.get(key)
+        if catalog is None:
+            catalog = self.build_question_catalog(age_group)
+            AutismScreeningTool._question_catalogs[key] = catalog
+        return catalog
+    
+    def build_question_catalog(self, age_group: str) -> Mapping[str, Mapping[str, Any]]:
+        """Build the immutable question catalog for one age group"""
+        
+        # Adapt language for different age groups
+        subject = QUESTION_SUBJECTS.get(age_group)
+        
+        adapted_questions = {}
         for indicator, data in self.all_indicators.items():
             question = data["question"]
-            
-            # Adapt language for different age groups
-            if age_group == "toddler":
-                question = question.replace("the person", "your child")
-                question = question.replace("Does the person", "Does your child")
-            elif age_group == "kid":
-                question = question.replace("the person", "your child")
-            elif age_group == "teenager":
-                question = question.replace("the person", "the teenager")
-            elif age_group in ["young", "senior"]:
-                question = question.replace("the person", "the individual")
-                
-            adapted_questions[indicator] = {
+            if subject:
+                question = question.replace("the person", subject)
+            adapted_questions[indicator] = MappingProxyType({
                 **data,
                 "question": question
-            }
+            })
             
-        return adapted_questions
+        return MappingProxyType(adapted_questions)
     
+    @instrumented("conduct_assessment")
     def conduct_assessment(self, age_months: int, participant_name: str = "Anonymous") -> AssessmentResult:
         """Conduct the full autism screening assessment"""
         
@@ -221,247 +965,467 @@ class AutismScreeningTool:
         print(f"{'='*60}\n")
         
         responses = {}
-        method_scores = {"social": [], "behavioral": [], "communication": []}
         
         # Group questions by method for better organization
         question_groups = [
-            ("Social Communication & Interaction", self.social_indicators, "social"),
-            ("Restricted & Repetitive Behaviors", self.behavioral_indicators, "behavioral"), 
-            ("Communication & Language", self.communication_indicators, "communication")
+            ("Social Communication & Interaction", self.social_indicators),
+            ("Restricted & Repetitive Behaviors", self.behavioral_indicators), 
+            ("Communication & Language", self.communication_indicators)
         ]
         
-        for group_name, indicators, method_key in question_groups:
-            print(f"\n📋 {group_name}")
-            print("-" * len(group_name))
-            
-            for indicator, data in indicators.items():
-                question = questions[indicator]["question"]
-                while True:
-                    try:
-                        print(f"\n{question}")
-                        print("Scale: 0=Never/Not at all, 1=Rarely, 2=Sometimes, 3=Often, 4=Always/Very much")
-                        response = int(input("Your rating (0-4): "))
-                        if 0 <= response <= 4:
-                            responses[indicator] = response
-                            
-                            # Calculate weighted score
-                            weight = data["weight"]
-                            if data["reverse_scored"]:
-                                score = (4 - response) * weight
+        with stage("conduct_assessment.input"):
+            for group_name, indicators in question_groups:
+                print(f"\n📋 {group_name}")
+                print("-" * len(group_name))
+                
+                for indicator in indicators:
+                    question = questions[indicator]["question"]
+                    while True:
+                        try:
+                            print(f"\n{question}")
+                            print("Scale: 0=Never/Not at all, 1=Rarely, 2=Sometimes, 3=Often, 4=Always/Very much")
+                            response = int(input("Your rating (0-4): "))
+                            if 0 <= response <= 4:
+                                responses[indicator] = response
+                                break
                             else:
-                                score = response * weight
-                                
-                            method_scores[method_key].append(score)
-                            break
-                        else:
-                            print("Please enter a number between 0 and 4.")
-                    except ValueError:
-                        print("Please enter a valid number.")
-        
-        # Calculate final scores
-        social_score = np.mean(method_scores["social"]) if method_scores["social"] else 0
-        behavioral_score = np.mean(method_scores["behavioral"]) if method_scores["behavioral"] else 0
-        communication_score = np.mean(method_scores["communication"]) if method_scores["communication"] else 0
-        
-        # Overall weighted score
-        total_score = (social_score * 0.35 + behavioral_score * 0.35 + communication_score * 0.30)
-        
-        # Determine risk level and confidence
-        risk_level, confidence = self.calculate_risk_level(total_score, age_group)
-        
-        # Generate recommendations
-        recommendations = self.generate_recommendations(
-            social_score, behavioral_score, communication_score, risk_level, age_group
-        )
+                                print("Please enter a number between 0 and 4.")
+                        except ValueError:
+                            print("Please enter a valid number.")
+        
+        return self.score_responses(responses, age_months, participant_name)
+    
+    @instrumented("score_responses")
+    def score_responses(self, responses: Union[Dict[str, int], Sequence[int]], age_months: int,
+                        participant_name: str = "Anonymous") -> AssessmentResult:
+        """Score pre-filled responses without any terminal I/O
+        
+        ``responses`` maps each indicator to a 0-4 rating, or lists the 21
+        ratings in ``self.indicator_order``.
+        """
+        
+        batch = self.score_batch([self.response_vector(responses)], age_months)
+        participant_id = f"{participant_name}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        return self.build_result(batch, 0, participant_id)
+    
+    def response_matrix(self, responses: np.ndarray) -> np.ndarray:
+        """Check an (N x 21) matrix of whole-number 0-4 ratings and return it as an array"""
+        
+        responses = np.asarray(responses)
+        if responses.ndim != 2 or responses.shape[1] != len(self.indicator_order):
+            raise ValueError(
+                f"Expected an (N x {len(self.indicator_order)}) response matrix, "
+                f"got shape {responses.shape}"
+            )
+        # Lookup scoring indexes by the integer rating, so fractional (or NaN)
+        # ratings would score differently from arithmetic mode
+        if responses.dtype.kind == "f" and not np.array_equal(responses, np.floor(responses)):
+            raise ValueError("Responses must be whole-number ratings")
+        if responses.size and (responses.min() < 0 or responses.max() > 4):
+            raise ValueError("Responses must be ratings between 0 and 4")
+        return responses
+    
+    def response_vector(self, responses: Union[Dict[str, int], Sequence[int]]) -> List[int]:
+        """Order a participant's ratings to match the columns of score_batch"""
+        
+        if isinstance(responses, dict):
+            missing = [indicator for indicator in self.indicator_order if indicator not in responses]
+            if missing:
+                raise ValueError(f"Missing responses for: {', '.join(missing)}")
+            responses = [parse_rating(responses[indicator]) for indicator in self.indicator_order]
+        else:
+            responses = [parse_rating(response) for response in responses]
+            if len(responses) != len(self.indicator_order):
+                raise ValueError(f"Expected {len(self.indicator_order)} responses, got {len(responses)}")
         
-        # Create result object
-        result = AssessmentResult(
-            participant_id=f"{participant_name}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}",
-            age_group=age_group,
-            assessment_date=datetime.datetime.now().isoformat(),
+        if any(response < 0 or response > 4 for response in responses):
+            raise ValueError("Responses must be ratings between 0 and 4")
+        return responses
+    
+    def build_result(self, batch: BatchScores, index: int, participant_id: str,
+                     assessment_date: Optional[str] = None) -> AssessmentResult:
+        """Create the AssessmentResult for one row of a scored batch"""
+        
+        # Round the NumPy scalars (np.round semantics), as conduct_assessment always
+        # did; converting to float first would round some ties the other way
+        social_score = float(round(batch.social[index], 2))
+        behavioral_score = float(round(batch.behavioral[index], 2))
+        communication_score = float(round(batch.communication[index], 2))
+        recommendation_set = int(batch.recommendation_set_ids[index])
+        
+        return AssessmentResult(
+            participant_id=participant_id,
+            age_group=batch.age_groups[index],
+            assessment_date=assessment_date or datetime.datetime.now().isoformat(),
             scores={
-                "social_communication": round(social_score, 2),
-                "behavioral_patterns": round(behavioral_score, 2),
-                "communication_language": round(communication_score, 2)
+                "social_communication": social_score,
+                "behavioral_patterns": behavioral_score,
+                "communication_language": communication_score
             },
-            total_score=round(total_score, 2),
-            risk_level=risk_level,
-            recommendations=recommendations,
-            confidence=round(confidence, 1)
+            total_score=float(round(batch.total[index], 2)),
+            risk_level=batch.risk_levels[index],
+            recommendations=RECOMMENDATION_SETS[recommendation_set],
+            confidence=round(float(batch.confidence[index]), 1),
+            recommendation_set_id=recommendation_set
         )
+    
+    def assess_stream(self, records: Iterable[Dict[str, Any]], chunk_size: int = 1000,
+                      on_chunk: Optional[Callable[[np.ndarray, np.ndarray, List[str]], None]] = None
+                      ) -> Iterator[AssessmentResult]:
+        """Score response records lazily in fixed-size chunks
+        
+        Only one chunk is held in memory at a time, so arbitrarily large inputs
+        can be scored. Each record needs ``age_months`` (or ``age_years``) and
+        the 21 ratings, either under ``responses`` or as top-level keys.
+        ``on_chunk`` is called with each chunk's response matrix, ages and
+        participant IDs before its results are yielded.
+        """
         
-        return result
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        
+        records = iter(records)
+        row_number = 0
+        while True:
+            chunk = list(itertools.islice(records, chunk_size))
+            if not chunk:
+                return
+            
+            timestamp = datetime.datetime.now()
+            assessment_date = timestamp.isoformat()
+            participant_ids, ages, rows = [], [], []
+            for record in chunk:
+                row_number += 1
+                try:
+                    age = record_age_months(record)
+                    row = self.response_vector(record.get("responses", record))
+                except (KeyError, TypeError, ValueError, OverflowError) as e:
+                    print(f"⚠️  Skipping record {row_number}: {e}", file=sys.stderr)
+                    continue
+                
+                participant_id = record.get("participant_id")
+                if not participant_id:
+                    name = record.get("participant_name") or "Anonymous"
+                    participant_id = f"{name}_{timestamp.strftime('%Y%m%d_%H%M%S')}_{row_number}"
+                participant_ids.append(participant_id)
+                ages.append(age)
+                rows.append(row)
+            
+            if not rows:
+                continue
+            
+            rows, ages = np.array(rows), np.array(ages)
+            batch = self.score_batch(rows, ages)
+            if on_chunk is not None:
+                on_chunk(rows, ages, participant_ids)
+            for index, participant_id in enumerate(participant_ids):
+                yield self.build_result(batch, index, participant_id, assessment_date)
+    
+    @instrumented("score_batch")
+    def score_batch(self, responses: np.ndarray,
+                    age_months: Union[int, Sequence[int], np.ndarray]) -> BatchScores:
+        """Score an (N x 21) response matrix in one vectorized pass
+        
+        Columns follow ``self.indicator_order``. ``age_months`` is either a single
+        age shared by every row or one age per row.
+        """
+        
+        responses = self.response_matrix(responses)
+        
+        n = responses.shape[0]
+        ages = np.broadcast_to(np.asarray(age_months), (n,))
+        age_groups = AGE_GROUP_LABELS[self.age_group_codes(ages)]
+        
+        domain_scores = self.domain_scores(responses)
+        total = weighted_total(domain_scores)
+        
+        risk_codes, risk_levels, confidence = self.risk_thresholds.classify(total, age_groups)
+        recommendation_sets = recommendation_set_ids(
+            domain_scores[:, 0], domain_scores[:, 1], domain_scores[:, 2], risk_codes, age_groups
+        )
+        
+        return BatchScores(
+            age_groups=age_groups,
+            social=domain_scores[:, 0],
+            behavioral=domain_scores[:, 1],
+            communication=domain_scores[:, 2],
+            total=total,
+            risk_codes=risk_codes,
+            risk_levels=risk_levels,
+            confidence=confidence,
+            recommendation_set_ids=recommendation_sets
+        )
+    
+    def domain_scores(self, responses: np.ndarray) -> np.ndarray:
+        """(N x 3) weighted domain means for a validated (N x 21) response matrix"""
+        
+        if self.score_tables is not None:
+            return self.score_tables.domain_scores(responses)
+        # Apply the reverse-scored flip and the indicator weights to every answer at once
+        weighted = np.where(self.reverse_mask, 4 - responses, responses) * self.indicator_weights
+        return domain_means(weighted, self.domain_slices)
+    
+    @instrumented("score_uncertainty")
+    def score_uncertainty(self, responses: np.ndarray, age_months: Union[int, Sequence[int], np.ndarray],
+                          draws: int = 1000, noise: Optional[ResponseNoiseModel] = None,
+                          interval: float = 0.95, seed: Optional[int] = None,
+                          block_ratings: int = 1 << 23) -> ScoreUncertainty:
+        """Monte Carlo uncertainty of the total score and risk level
+        
+        Every participant's ratings are perturbed ``draws`` times under the
+        noise model. The total score is linear in each (clipped) rating, so a
+        draw's total is the score_batch total plus each moved rating's change
+        times that indicator's signed weight in the total. All draws for a
+        block of participants are simulated as one array; ``block_ratings``
+        caps the ratings per block to bound memory.
+        """
+        
+        responses = self.response_matrix(responses)
+        if draws < 1 or not 0 < interval < 1:
+            raise ValueError("Need at least one draw and an interval between 0 and 1")
+        
+        noise = noise or DEFAULT_NOISE_MODEL
+        rng = np.random.default_rng(seed)
+        n, width = responses.shape
+        group_codes = self.age_group_codes(np.broadcast_to(np.asarray(age_months), (n,)))
+        base = weighted_total(self.domain_scores(responses))
+        # Interval bounds interpolate linearly between order statistics, as np.quantile does
+        ranks = np.array([(1 - interval) / 2, (1 + interval) / 2]) * (draws - 1)
+        lower_ranks = np.floor(ranks).astype(np.int64)
+        upper_ranks = np.minimum(lower_ranks + 1, draws - 1)
+        fractions = ranks - lower_ranks
+        
+        # Change in the total per rating point of each indicator
+        coefficients = np.empty(width)
+        for column, domain_slice in enumerate(self.domain_slices.values()):
+            coefficients[domain_slice] = DOMAIN_WEIGHTS[column] / (domain_slice.stop - domain_slice.start)
+        coefficients *= np.where(self.reverse_mask, -1.0, 1.0) * self.indicator_weights
+        
+        total_mean = np.empty(n)
+        bounds = np.empty((2, n))
+        risk_probabilities = np.empty((n, len(RISK_LEVELS)))
+        block = max(1, block_ratings // (draws * width))
+        for start in range(0, n, block):
+            rows = responses[start:start + block].astype(np.int8)
+            # Ratings are numbered (participant, draw, indicator) in row-major order;
+            # a cell is one participant's draw
+            positions, shifts = noise.sample_moves(rng, len(rows) * draws * width)
+            cell = positions // width
+            indicator = positions - cell * width
+            rating = rows[cell // draws, indicator]
+            change = np.clip(rating + shifts, 0, 4) - rating
+            totals = base[start:start + block, None] + np.bincount(
+                cell, weights=change * coefficients[indicator], minlength=len(rows) * draws
+            ).reshape(len(rows), draws)
+            
+            codes = np.empty(totals.shape, dtype=np.int64)
+            block_groups = group_codes[start:start + block]
+            for code in np.unique(block_groups):
+                mask = block_groups == code
+                cutoffs = self.risk_thresholds.cutoffs[self.risk_thresholds._group(AGE_GROUPS[code])]
+                codes[mask] = np.searchsorted(cutoffs, totals[mask], side="right")
+            codes += np.arange(len(rows))[:, None] * len(RISK_LEVELS)
+            
+            total_mean[start:start + block] = totals.mean(axis=1)
+            totals.partition(np.unique(np.concatenate([lower_ranks, upper_ranks])), axis=1)
+            bounds[:, start:start + block] = (totals[:, lower_ranks] * (1 - fractions)
+                                              + totals[:, upper_ranks] * fractions).T
+            risk_probabilities[start:start + block] = np.bincount(
+                codes.ravel(), minlength=len(rows) * len(RISK_LEVELS)
+            ).reshape(len(rows), len(RISK_LEVELS)) / draws
+        
+        return ScoreUncertainty(total_mean, bounds[0], bounds[1], risk_probabilities, draws, interval)
+    
+    def calculate_risk_levels(self, total_scores: np.ndarray,
+                              age_groups: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized counterpart of calculate_risk_level for arrays of scores"""
+        
+        _, risk_levels, confidence = self.risk_thresholds.classify(total_scores, age_groups)
+        return risk_levels, confidence
     
     def calculate_risk_level(self, total_score: float, age_group: str) -> Tuple[str, float]:
         """Calculate risk level and confidence based on score and age group"""
         
-        # Age-adjusted thresholds (younger children may show different patterns)
-        if age_group == "toddler":
-            if total_score >= 2.5:
-                return "High", 92.5
-            elif total_score >= 1.8:
-                return "Moderate", 85.3
-            elif total_score >= 1.2:
-                return "Low-Moderate", 78.1
-            else:
-                return "Low", 94.8
-        else:
-            if total_score >= 2.8:
-                return "High", 95.2
-            elif total_score >= 2.0:
-                return "Moderate", 88.7
-            elif total_score >= 1.3:
-                return "Low-Moderate", 82.4
-            else:
-                return "Low", 96.1
+        return self.risk_thresholds.classify_one(total_score, age_group)
     
     def generate_recommendations(self, social_score: float, behavioral_score: float, 
-                               communication_score: float, risk_level: str, age_group: str) -> List[str]:
-        """Generate personalized recommendations based on assessment results"""
-        
-        recommendations = []
-        
-        # Universal recommendations
-        recommendations.append("Consider discussing these results with a healthcare professional")
-        recommendations.append("Remember that every individual is unique and has their own strengths")
-        
-        # Risk-level specific recommendations
-        if risk_level == "High":
-            recommendations.extend([
-                "Seek evaluation from a qualified autism specialist or developmental pediatrician",
-                "Consider early intervention services if appropriate for age",
-                "Connect with local autism support organizations",
-                "Explore evidence-based therapies and interventions"
-            ])
-        elif risk_level == "Moderate":
-            recommendations.extend([
-                "Discuss findings with your primary care provider",
-                "Consider a more comprehensive developmental evaluation",
-                "Monitor development and reassess in 3-6 months",
-                "Look into supportive resources and strategies"
-            ])
-        elif risk_level == "Low-Moderate":
-            recommendations.extend([
-                "Continue monitoring development",
-                "Share observations with healthcare providers at routine visits",
-                "Consider environmental supports if helpful",
-                "Reassess if new concerns arise"
-            ])
-        else:  # Low risk
-            recommendations.extend([
-                "Continue supporting healthy development",
-                "Stay aware of developmental milestones",
-                "Reassess if new concerns arise in the future"
-            ])
-        
-        # Domain-specific recommendations
-        if social_score >= 2.0:
-            recommendations.append("Focus on social skills development and interaction opportunities")
-        
-        if behavioral_score >= 2.0:
-            recommendations.append("Consider sensory accommodations and routine supports")
-            
-        if communication_score >= 2.0:
-            recommendations.append("Explore speech-language evaluation and support")
-        
-        # Age-specific recommendations
-        if age_group == "toddler":
-            recommendations.append("Early intervention is most effective during these crucial years")
-        elif age_group in ["young", "senior"]:
-            recommendations.append("Adult services and supports may be available in your area")
-            
-        return recommendations
+                               communication_score: float, risk_level: str, age_group: str) -> Tuple[str, ...]:
+        """Generate personalized recommendations based on assessment results
+        
+        Returns the shared, precomputed set for this outcome (see RECOMMENDATION_SETS).
+        """
+        
+        return RECOMMENDATION_SETS[recommendation_set_id(
+            social_score, behavioral_score, communication_score, risk_level, age_group
+        )]
     
+    @instrumented("generate_report")
     def generate_report(self, result: AssessmentResult) -> str:
         """Generate a comprehensive, compassionate report"""
         
-        report = f"""
-{'='*80}
-🤝 UNDERSTANDING TOGETHER - ASSESSMENT REPORT
-{'='*80}
-
-PARTICIPANT INFORMATION
-Participant ID: {result.participant_id}
-Age Group: {result.age_group.title()}
-Assessment Date: {result.assessment_date}
-Assessment Confidence: {result.confidence}%
-
-ASSESSMENT RESULTS
-{'─'*40}
-Total Score: {result.total_score}/4.0
-Risk Level: {result.risk_level}
-
-DOMAIN SCORES
-{'─'*40}
-Social Communication & Interaction: {result.scores['social_communication']}/4.0
-Restricted & Repetitive Behaviors: {result.scores['behavioral_patterns']}/4.0  
-Communication & Language: {result.scores['communication_language']}/4.0
-
-UNDERSTANDING YOUR RESULTS
-{'─'*40}
-This assessment provides insights based on established autism screening tools.
-The results indicate areas that may benefit from further evaluation or support.
-
-• Scores closer to 0 suggest fewer autism-related characteristics
-• Scores closer to 4 suggest more autism-related characteristics  
-• Higher confidence indicates more reliable results
-
-RECOMMENDATIONS
-{'─'*40}"""
+        return COMPILED_REPORT.render(result)
+    
+    @instrumented("write_report")
+    def write_report(self, result: AssessmentResult, output: TextIO):
+        """Stream the report for one result straight into a file or buffer"""
         
-        for i, recommendation in enumerate(result.recommendations, 1):
-            report += f"\n{i}. {recommendation}"
+        COMPILED_REPORT.render_to(result, output)
+    
+    def write_reports(self, results: Iterable[AssessmentResult], path: str,
+                      shard_size: Optional[int] = None) -> List[str]:
+        """Write many reports back to back into one file, or into shards
         
-        report += f"""
-
-IMPORTANT NOTES
-{'─'*40}
-• This tool is for screening purposes only and is not diagnostic
-• Results should be interpreted by qualified professionals
-• Every individual is unique with their own strengths and challenges
-• Early identification can lead to better support and outcomes
-• You are not alone - support and resources are available
-
-NEXT STEPS
-{'─'*40}
-1. Save this report for your records
-2. Share results with healthcare providers
-3. Connect with autism support organizations if helpful
-4. Remember that assessment is just the beginning of understanding
-
-For support and resources, visit: autismspeaks.org | autism-society.org
-
-Generated by Understanding Together Assessment Tool v1.0
-Confidence Level: {result.confidence}% | Reliability: 98.5%
-{'='*80}
-"""
-        return report
+        With ``shard_size`` every ``shard_size`` reports go to a new file named
+        ``<stem>_00000<ext>``, ``<stem>_00001<ext>``, ... Returns the files written.
+        """
+        
+        stem, ext = os.path.splitext(path)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        results = iter(results)
+        filenames = []
+        while True:
+            chunk = itertools.islice(results, shard_size) if shard_size else results
+            first = next(chunk, None)
+            if first is None:
+                break
+            filename = f"{stem}_{len(filenames):05d}{ext}" if shard_size else path
+            with open(filename, "w") as f:
+                for result in itertools.chain([first], chunk):
+                    COMPILED_REPORT.render_to(result, f)
+            filenames.append(filename)
+            if not shard_size:
+                break
+        return filenames
     
-    def save_results(self, result: AssessmentResult, save_visualization: bool = True) -> str:
-        """Save results to JSON file and optionally create visualization"""
+    @instrumented("save_results")
+    def save_results(self, result: AssessmentResult, save_visualization: bool = True,
+                     results_dir: str = "assessment_results", chart_backend: str = "matplotlib",
+                     compact_recommendations: bool = False, layout: str = "flat") -> str:
+        """Save results to JSON file and optionally create visualization
         
-        # Create results directory if it doesn't exist
-        results_dir = "assessment_results"
-        os.makedirs(results_dir, exist_ok=True)
+        With ``compact_recommendations`` the JSON stores the recommendation-set
+        ID instead of the full list (expand it again with result_from_dict).
+        With ``layout="sharded"`` the files are named by a collision-free record
+        ID, placed in a hashed subdirectory and added to the results manifest.
+        """
+        
+        if layout not in RESULT_LAYOUTS:
+            raise ValueError(f"Unknown results layout: {layout}")
+        store = None
+        if layout == "sharded":
+            from assessment_store import ShardedResultStore
+            store = ShardedResultStore(results_dir)
+            record_id, directory = store.allocate()
+        else:
+            record_id, directory = result.participant_id, results_dir
+            # Create results directory if it doesn't exist
+            os.makedirs(results_dir, exist_ok=True)
         
         # Save JSON results
-        filename = f"{results_dir}/{result.participant_id}_results.json"
-        with open(filename, 'w') as f:
-            json.dump(asdict(result), f, indent=2)
+        filename = f"{directory}/{record_id}_results.json"
+        with stage("save_results.json"), open(filename, 'w') as f:
+            json.dump(result_to_dict(result, compact_recommendations), f, indent=2)
         
         # Save text report
-        report_filename = f"{results_dir}/{result.participant_id}_report.txt"
+        report_filename = f"{directory}/{record_id}_report.txt"
         with open(report_filename, 'w') as f:
-            f.write(self.generate_report(result))
+            self.write_report(result, f)
         
         # Create visualization if requested
+        viz_filename = None
         if save_visualization:
-            self.create_visualization(result, results_dir)
+            viz_filename = self.create_visualization(result, directory, chart_backend, record_id)
+        
+        if store is not None:
+            store.record(record_id, result, results=filename, report=report_filename,
+                         visualization=viz_filename)
+        
+        for hook in self.save_hooks:
+            hook(result)
         
         return filename
     
-    def create_visualization(self, result: AssessmentResult, results_dir: str):
-        """Create visual charts of assessment results"""
+    def save_results_parallel(self, results: Iterable[AssessmentResult], save_visualization: bool = True,
+                              results_dir: str = "assessment_results", workers: Optional[int] = None,
+                              chunk_size: int = 8, chart_backend: str = "matplotlib",
+                              layout: str = "flat") -> Dict[str, Any]:
+        """Save many results across a process pool
+        
+        Results are sent to the workers in chunks of ``chunk_size`` and at most
+        two chunks per worker are in flight, so ``results`` may be a lazy stream.
+        A failure for one participant is recorded in the returned summary
+        instead of aborting the batch. ``save_hooks`` run in this process for
+        every result that was saved successfully, and while instrumentation is
+        enabled the workers' stage metrics are merged into this process's.
+        """
+        
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        workers = workers or os.cpu_count() or 1
+        
+        summary = {"saved": 0, "failed": []}
+        collector = assessment_metrics.active()
+        
+        def collect(future, chunk):
+            outcomes, snapshot = future.result()
+            if snapshot:
+                collector.merge(snapshot)
+            for result, (participant_id, error) in zip(chunk, outcomes):
+                if error is None:
+                    summary["saved"] += 1
+                    for hook in self.save_hooks:
+                        hook(result)
+                else:
+                    summary["failed"].append({"participant_id": participant_id, "error": error})
+        
+        results = iter(results)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = {}
+            while True:
+                chunk = list(itertools.islice(results, chunk_size))
+                if not chunk:
+                    break
+                future = executor.submit(_save_results_chunk, chunk, save_visualization,
+                                         results_dir, chart_backend, layout,
+                                         None if collector is None else collector.trace_memory)
+                pending[future] = chunk
+                
+                # Bound the number of in-flight chunks
+                if len(pending) >= workers * 2:
+                    done, _ = concurrent.futures.wait(
+                        pending, return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                    for future in done:
+                        collect(future, pending.pop(future))
+            
+            for future in concurrent.futures.as_completed(list(pending)):
+                collect(future, pending.pop(future))
+        
+        return summary
+    
+    @instrumented("create_visualization")
+    def create_visualization(self, result: AssessmentResult, results_dir: str,
+                             backend: str = "matplotlib", filename_stem: Optional[str] = None) -> str:
+        """Create visual charts of assessment results
+        
+        ``backend`` is "matplotlib" (high-fidelity, default), or "svg" / "png" for
+        the lightweight renderer in assessment_charts, which skips matplotlib.
+        The file is named after ``filename_stem`` (default: the participant ID);
+        its path is returned rather than printed, so batch output stays clean.
+        """
+        
+        filename_stem = filename_stem or result.participant_id
+        if backend in ("svg", "png"):
+            from assessment_charts import save_chart
+            return save_chart(result, results_dir, backend, filename_stem)
+        if backend != "matplotlib":
+            raise ValueError(f"Unknown chart backend: {backend}")
+        
+        # Imported here so scoring-only processes never pay for matplotlib
+        import matplotlib.pyplot as plt
         
         # Set up the plotting style
         plt.style.use('dark_background')
@@ -530,15 +1494,276 @@ Confidence Level: {result.confidence}% | Reliability: 98.5%
         plt.tight_layout()
         
         # Save visualization
-        viz_filename = f"{results_dir}/{result.participant_id}_visualization.png"
-        plt.savefig(viz_filename, dpi=300, bbox_inches='tight', 
-                   facecolor='#0a0e27', edgecolor='none')
+        viz_filename = f"{results_dir}/{filename_stem}_visualization.png"
+        with stage("create_visualization.savefig"):
+            plt.savefig(viz_filename, dpi=300, bbox_inches='tight', 
+                       facecolor='#0a0e27', edgecolor='none')
         plt.close()
         
-        print(f"📊 Visualization saved: {viz_filename}")
+        return viz_filename
 
-def main():
-    """Main function to run the autism screening assessment"""
+_worker_tool = None
+
+def _save_results_chunk(results: List[AssessmentResult], save_visualization: bool, results_dir: str,
+                        chart_backend: str, layout: str = "flat", metrics: Optional[bool] = None
+                        ) -> Tuple[List[Tuple[str, Optional[str]]], Optional[Dict[str, Any]]]:
+    """Process-pool worker: save a chunk of results, reporting failures per participant
+    
+    ``metrics`` (None, or the parent's trace_memory setting) turns on stage
+    instrumentation in the worker; the chunk's stage metrics are returned
+    alongside the outcomes so the parent can merge them.
+    """
+    
+    global _worker_tool
+    if _worker_tool is None:
+        _worker_tool = AutismScreeningTool()
+    if metrics is not None:
+        # A fresh collector per chunk (a forked worker may inherit the parent's)
+        collector = assessment_metrics.enable(trace_memory=metrics)
+    
+    outcomes = []
+    for result in results:
+        try:
+            _worker_tool.save_results(result, save_visualization, results_dir, chart_backend,
+                                      layout=layout)
+            outcomes.append((result.participant_id, None))
+        except Exception as e:
+            outcomes.append((result.participant_id, f"{type(e).__name__}: {e}"))
+    
+    return outcomes, collector.to_dict()["stages"] if metrics is not None else None
+
+def parse_rating(value: Any) -> int:
+    """Read one rating as a whole number ("2" and 2.0 are fine, 2.7 is rejected)"""
+    
+    rating = float(value)
+    if not rating.is_integer():
+        raise ValueError(f"Ratings must be whole numbers, got {value!r}")
+    return int(rating)
+
+def record_age_months(record: Dict[str, Any]) -> int:
+    """Read a record's age in months, accepting either age_months or age_years"""
+    
+    for field, months in (("age_months", 1), ("age_years", 12)):
+        if record.get(field) not in (None, ""):
+            age = float(record[field])
+            if not math.isfinite(age):
+                raise ValueError(f"{field} must be a finite number")
+            return int(age * months)
+    raise KeyError("age_months")
+
+def read_response_records(source: Union[str, TextIO], fmt: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Stream response records from a JSONL or CSV file, or from stdin ("-")"""
+    
+    if fmt is None:
+        name = source if isinstance(source, str) else getattr(source, "name", "")
+        fmt = "csv" if str(name).lower().endswith(".csv") else "jsonl"
+    
+    if isinstance(source, str):
+        if source == "-":
+            yield from read_response_records(sys.stdin, fmt)
+            return
+        with open(source, newline="") as f:
+            yield from read_response_records(f, fmt)
+        return
+    
+    if fmt == "csv":
+        yield from csv.DictReader(source)
+    elif fmt == "jsonl":
+        for line_number, line in enumerate(source, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"⚠️  Skipping line {line_number}: invalid JSON ({e})", file=sys.stderr)
+                continue
+            if not isinstance(record, dict):
+                print(f"⚠️  Skipping line {line_number}: expected a JSON object", file=sys.stderr)
+                continue
+            yield record
+    else:
+        raise ValueError(f"Unsupported input format: {fmt}")
+
+def run_batch_assessment(input_path: str, output_path: Optional[str] = "-", fmt: Optional[str] = None,
+                         chunk_size: int = 1000, save_reports: bool = False,
+                         save_visualization: bool = True, results_dir: str = "assessment_results",
+                         workers: Optional[int] = None, save_chunk_size: int = 8,
+                         chart_backend: str = "matplotlib", thresholds_path: Optional[str] = None,
+                         compact_recommendations: bool = False, database_path: Optional[str] = None,
+                         statistics_path: Optional[str] = None, reports_path: Optional[str] = None,
+                         reports_shard_size: Optional[int] = None, layout: str = "flat",
+                         scoring: str = "arithmetic", instrument_path: Optional[str] = None,
+                         uncertainty_draws: int = 0, noise: Optional[ResponseNoiseModel] = None,
+                         uncertainty_interval: float = 0.95) -> int:
+    """Score every record in input_path and stream JSONL results to output_path
+    
+    With ``save_reports`` the per-participant JSON, report and chart files are
+    also written through the parallel save pipeline, and with ``database_path``
+    results are appended to an indexed SQLite store (pass ``output_path=None``
+    to skip the JSONL stream). ``statistics_path`` keeps running cohort
+    statistics for every emitted result (only the saved ones with
+    ``save_reports``). ``thresholds_path`` loads an alternative risk threshold
+    set (JSON or TOML). ``reports_path`` writes every text report into one file
+    (or shards of ``reports_shard_size``) instead of per-participant files.
+    ``layout="sharded"`` saves the per-participant files into hashed
+    subdirectories with a manifest. ``scoring="lookup"`` scores from
+    precomputed domain score tables, and ``instrument_path`` loads alternative
+    indicator definitions (JSON or TOML). ``uncertainty_draws`` adds Monte Carlo
+    score intervals (``uncertainty_interval`` coverage) and risk-level
+    probabilities under ``noise`` to every JSONL record.
+    """
+    
+    tool = AutismScreeningTool(RiskThresholdTable.from_file(thresholds_path) if thresholds_path else None,
+                               scoring, instrument=instrument_path)
+    records = read_response_records(input_path, fmt)
+    
+    database = recorder = None
+    if database_path:
+        from assessment_store import AssessmentDatabase
+        database = AssessmentDatabase(database_path, statistics_path=statistics_path)
+    elif statistics_path:
+        from assessment_store import StatisticsRecorder
+        recorder = StatisticsRecorder(statistics_path, persist_every=1000)
+        if save_reports:
+            # Count only results whose files were saved
+            tool.save_hooks.append(recorder)
+    
+    output = None if output_path is None else sys.stdout if output_path == "-" else open(output_path, "w")
+    count = 0
+    
+    # Monte Carlo intervals for the chunk being emitted, and its next row
+    uncertainty = [None, 0]
+    
+    def simulate(rows, ages, participant_ids):
+        uncertainty[:] = [tool.score_uncertainty(rows, ages, uncertainty_draws, noise,
+                                                       uncertainty_interval), 0]
+    
+    def emit(results):
+        nonlocal count
+        for result in results:
+            if output is not None:
+                data = result_to_dict(result, compact_recommendations)
+                if uncertainty[0] is not None:
+                    data["uncertainty"] = uncertainty[0].to_dict(uncertainty[1])
+                    uncertainty[1] += 1
+                output.write(json.dumps(data))
+                output.write("\n")
+            if database is not None:
+                database.append(result)
+            elif recorder is not None and not save_reports:
+                recorder(result)
+            count += 1
+            yield result
+    
+    try:
+        results = emit(tool.assess_stream(records, chunk_size,
+                                          simulate if uncertainty_draws and output is not None else None))
+        if save_reports:
+            summary = tool.save_results_parallel(results, save_visualization, results_dir,
+                                                 workers, save_chunk_size, chart_backend, layout)
+        elif reports_path:
+            report_files = tool.write_reports(results, reports_path, reports_shard_size)
+        else:
+            for _ in results:
+                pass
+    finally:
+        if output not in (None, sys.stdout):
+            output.close()
+        if database is not None:
+            database.close()
+        if recorder is not None:
+            recorder.flush()
+    
+    print(f"✅ Scored {count} assessments", file=sys.stderr)
+    if reports_path and not save_reports:
+        print(f"📄 Wrote {count} reports to {len(report_files)} file(s)", file=sys.stderr)
+    if save_reports:
+        print(f"📄 Saved {summary['saved']} reports to {results_dir}/", file=sys.stderr)
+        for failure in summary["failed"]:
+            print(f"❌ {failure['participant_id']}: {failure['error']}", file=sys.stderr)
+    return count
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """Parse command-line options (no options starts the interactive assessment)"""
+    
+    parser = argparse.ArgumentParser(description="Understanding Together - Autism Screening Assessment")
+    parser.add_argument("--batch", metavar="INPUT",
+                        help="score response records from a JSONL or CSV file ('-' for stdin)")
+    parser.add_argument("--format", choices=["jsonl", "csv"],
+                        help="input format (default: detected from the file extension)")
+    parser.add_argument("--output", default="-",
+                        help="JSONL file for the scored results (default: stdout, 'none' to skip)")
+    parser.add_argument("--database", metavar="PATH",
+                        help="also append results to an indexed SQLite results database")
+    parser.add_argument("--statistics", metavar="PATH",
+                        help="JSON file of running cohort statistics kept up to date as results are stored")
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help="number of records scored per vectorized chunk")
+    parser.add_argument("--thresholds", metavar="CONFIG",
+                        help="JSON or TOML file with alternative risk thresholds per age group")
+    parser.add_argument("--instrument", metavar="CONFIG",
+                        help="JSON or TOML file with alternative indicator definitions")
+    parser.add_argument("--scoring", choices=SCORING_MODES, default="arithmetic",
+                        help="compute domain scores directly or read them from precomputed lookup tables")
+    parser.add_argument("--uncertainty", type=int, default=0, metavar="DRAWS",
+                        help="add Monte Carlo score intervals and risk-level probabilities from DRAWS "
+                             "simulated response sets per participant")
+    parser.add_argument("--noise", type=float, default=0.1, metavar="PROBABILITY",
+                        help="with --uncertainty: chance that each rating is off by one point either way")
+    parser.add_argument("--interval", type=float, default=0.95,
+                        help="with --uncertainty: coverage of the reported total-score interval")
+    parser.add_argument("--compact-recommendations", action="store_true",
+                        help="write recommendation-set IDs instead of full recommendation lists")
+    parser.add_argument("--save-reports", action="store_true",
+                        help="also save JSON, text report and chart files for every participant")
+    parser.add_argument("--reports-file", metavar="PATH",
+                        help="write all text reports into one file instead of per-participant files")
+    parser.add_argument("--reports-shard-size", type=int,
+                        help="with --reports-file: start a new numbered file every N reports")
+    parser.add_argument("--no-visualization", action="store_true",
+                        help="skip chart rendering when saving reports")
+    parser.add_argument("--chart-backend", choices=["matplotlib", "svg", "png"], default="matplotlib",
+                        help="chart renderer: high-fidelity matplotlib or the lightweight SVG/PNG writer")
+    parser.add_argument("--results-dir", default="assessment_results",
+                        help="directory for saved reports (default: assessment_results)")
+    parser.add_argument("--layout", choices=RESULT_LAYOUTS, default="flat",
+                        help="per-participant file layout: one flat directory, or hashed "
+                             "subdirectories indexed by a manifest")
+    parser.add_argument("--workers", type=int,
+                        help="processes used to save reports (default: CPU count)")
+    parser.add_argument("--save-chunk-size", type=int, default=8,
+                        help="results handed to a save worker at a time")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="record per-stage timings (scoring, reports, JSON, charts) and write them here")
+    parser.add_argument("--metrics-format", choices=["json", "prometheus"], default="json",
+                        help="format of the --metrics file")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="with --metrics: also record each stage's peak memory via tracemalloc "
+                             "(slows allocation-heavy stages such as PNG charts considerably)")
+    return parser.parse_args(argv)
+
+def run_assessment(args: argparse.Namespace):
+    """Run batch scoring or the interactive assessment for parsed command-line options"""
+    
+    if args.batch:
+        if args.save_reports and args.reports_file:
+            sys.exit("--save-reports and --reports-file cannot be combined")
+        output = None if args.output.lower() == "none" else args.output
+        run_batch_assessment(args.batch, output, fmt=args.format, chunk_size=args.chunk_size,
+                             save_reports=args.save_reports,
+                             save_visualization=not args.no_visualization,
+                             results_dir=args.results_dir, workers=args.workers,
+                             save_chunk_size=args.save_chunk_size, chart_backend=args.chart_backend,
+                             thresholds_path=args.thresholds,
+                             compact_recommendations=args.compact_recommendations,
+                             database_path=args.database, statistics_path=args.statistics,
+                             reports_path=args.reports_file, reports_shard_size=args.reports_shard_size,
+                             layout=args.layout, scoring=args.scoring, instrument_path=args.instrument,
+                             uncertainty_draws=args.uncertainty,
+                             noise=ResponseNoiseModel.symmetric(args.noise),
+                             uncertainty_interval=args.interval)
+        return
     
     print("🤝 Welcome to Understanding Together")
     print("Compassionate AI technology supporting early autism identification and care")
@@ -559,7 +1784,8 @@ def main():
             print("Please enter a valid age in years (e.g., 2.5 for 2 years 6 months)")
     
     # Create assessment tool and conduct assessment
-    tool = AutismScreeningTool()
+    tool = AutismScreeningTool(RiskThresholdTable.from_file(args.thresholds) if args.thresholds else None,
+                               args.scoring, instrument=args.instrument)
     result = tool.conduct_assessment(age_months, name)
     
     # Display results
@@ -599,5 +1825,21 @@ def main():
         print("\nThank you for using Understanding Together.")
         print("Remember: You are not alone, and support is available.")
 
+def main(argv: Optional[Sequence[str]] = None):
+    """Main function to run the autism screening assessment"""
+    
+    args = parse_args(argv)
+    if not args.metrics:
+        run_assessment(args)
+        return
+    
+    collector = assessment_metrics.enable(trace_memory=args.trace_memory)
+    try:
+        run_assessment(args)
+    finally:
+        assessment_metrics.disable()
+        collector.write(args.metrics, args.metrics_format)
+        print(f"⏱️  Stage metrics saved: {args.metrics}", file=sys.stderr)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -8,7 +8,7 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from autism_assessment import AutismScreeningTool
+from autism_assessment import RISK_LEVELS, AutismScreeningTool
 
 def run_demo_assessment():
     """Run a demonstration of the autism assessment with pre-filled responses"""
@@ -65,77 +65,8 @@ def run_demo_assessment():
     print(f"\n📋 Processing Assessment Responses...")
     print("Note: This uses simulated responses for demonstration purposes")
     
-    # Calculate scores manually using the same logic as the assessment
-    method_scores = {"social": [], "behavioral": [], "communication": []}
-    
-    # Process social indicators
-    for indicator, response in demo_responses.items():
-        if indicator in tool.social_indicators:
-            data = tool.social_indicators[indicator]
-            weight = data["weight"]
-            if data["reverse_scored"]:
-                score = (4 - response) * weight
-            else:
-                score = response * weight
-            method_scores["social"].append(score)
-    
-    # Process behavioral indicators
-    for indicator, response in demo_responses.items():
-        if indicator in tool.behavioral_indicators:
-            data = tool.behavioral_indicators[indicator]
-            weight = data["weight"]
-            if data["reverse_scored"]:
-                score = (4 - response) * weight
-            else:
-                score = response * weight
-            method_scores["behavioral"].append(score)
-    
-    # Process communication indicators
-    for indicator, response in demo_responses.items():
-        if indicator in tool.communication_indicators:
-            data = tool.communication_indicators[indicator]
-            weight = data["weight"]
-            if data["reverse_scored"]:
-                score = (4 - response) * weight
-            else:
-                score = response * weight
-            method_scores["communication"].append(score)
-    
-    # Calculate final scores
-    import numpy as np
-    social_score = np.mean(method_scores["social"])
-    behavioral_score = np.mean(method_scores["behavioral"])
-    communication_score = np.mean(method_scores["communication"])
-    
-    # Overall weighted score
-    total_score = (social_score * 0.35 + behavioral_score * 0.35 + communication_score * 0.30)
-    
-    # Determine risk level
-    risk_level, confidence = tool.calculate_risk_level(total_score, age_group)
-    
-    # Generate recommendations
-    recommendations = tool.generate_recommendations(
-        social_score, behavioral_score, communication_score, risk_level, age_group
-    )
-    
-    # Create result object
-    from autism_assessment import AssessmentResult
-    import datetime
-    
-    result = AssessmentResult(
-        participant_id=f"{participant_name}_demo_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}",
-        age_group=age_group,
-        assessment_date=datetime.datetime.now().isoformat(),
-        scores={
-            "social_communication": round(social_score, 2),
-            "behavioral_patterns": round(behavioral_score, 2),
-            "communication_language": round(communication_score, 2)
-        },
-        total_score=round(total_score, 2),
-        risk_level=risk_level,
-        recommendations=recommendations,
-        confidence=round(confidence, 1)
-    )
+    # Score the pre-filled responses through the same engine as the interactive flow
+    result = tool.score_responses(demo_responses, age_months, f"{participant_name}_demo")
     
     # Display results
     print("\n" + "="*60)
@@ -175,6 +106,33 @@ def run_demo_assessment():
     
     return result
 
+def run_cohort_demo(size=500, seed=0):
+    """Score a simulated cohort to show how results spread across age groups"""
+    
+    from assessment_cohort import generate_cohort
+    
+    print("🤝 UNDERSTANDING TOGETHER - COHORT DEMO")
+    print("="*60)
+    print(f"Scoring {size} simulated participants (seed {seed}).")
+    print("These are synthetic responses and do not represent real individuals.")
+    print("="*60)
+    
+    tool = AutismScreeningTool()
+    cohort = generate_cohort(size, seed, tool=tool)
+    batch = tool.score_batch(cohort.responses, cohort.age_months)
+    
+    print(f"\n{'Age Group':<12}{'Count':>7}{'Mean Score':>12}  Risk Levels")
+    print("-" * 60)
+    for age_group in tool.age_groups:
+        in_group = batch.age_groups == age_group
+        if not in_group.any():
+            continue
+        levels = batch.risk_levels[in_group]
+        spread = ", ".join(f"{level} {(levels == level).sum()}" for level in RISK_LEVELS if (levels == level).any())
+        print(f"{age_group.title():<12}{in_group.sum():>7}{batch.total[in_group].mean():>12.2f}  {spread}")
+    
+    return batch
+
 def show_assessment_features():
     """Show the key features implemented from the website"""
     
@@ -217,7 +175,7 @@ if __name__ == "__main__":
     print("Based on your website's requirements and design")
     print("="*60)
     
-    choice = input("\nChoose an option:\n1. Run interactive assessment\n2. Run demo with sample data\n3. Show features\n\nEnter choice (1/2/3): ")
+    choice = input("\nChoose an option:\n1. Run interactive assessment\n2. Run demo with sample data\n3. Show features\n4. Run demo with a simulated cohort\n\nEnter choice (1/2/3/4): ")
     
     if choice == "1":
         # Run the full interactive assessment
@@ -229,6 +187,9 @@ if __name__ == "__main__":
     elif choice == "3":
         # Show features
         show_assessment_features()
+    elif choice == "4":
+        # Score a synthetic cohort
+        run_cohort_demo()
     else:
         print("Invalid choice. Running demo...")
         run_demo_assessment()
\ No newline at end of file
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Understanding Together - Headless scoring regression
+score_responses must report exactly what the original per-answer arithmetic of
+conduct_assessment reported for the same ratings
+"""
+
+import numpy as np
+import pytest
+
+from autism_assessment import AutismScreeningTool
+
+def original_assessment(tool: AutismScreeningTool, responses, age_months: int):
+    """The per-answer scoring loop of the original interactive conduct_assessment"""
+
+    age_group = tool.determine_age_group(age_months)
+    method_scores = {"social": [], "behavioral": [], "communication": []}
+    for indicators, method_key in ((tool.social_indicators, "social"), (tool.behavioral_indicators, "behavioral"),
+                                   (tool.communication_indicators, "communication")):
+        for indicator, data in indicators.items():
+            response = responses[indicator]
+            if data["reverse_scored"]:
+                score = (4 - response) * data["weight"]
+            else:
+                score = response * data["weight"]
+            method_scores[method_key].append(score)
+
+    social_score = np.mean(method_scores["social"])
+    behavioral_score = np.mean(method_scores["behavioral"])
+    communication_score = np.mean(method_scores["communication"])
+    total_score = (social_score * 0.35 + behavioral_score * 0.35 + communication_score * 0.30)
+
+    if age_group == "toddler":
+        cutoffs = ((2.5, "High", 92.5), (1.8, "Moderate", 85.3), (1.2, "Low-Moderate", 78.1))
+        risk_level, confidence = "Low", 94.8
+    else:
+        cutoffs = ((2.8, "High", 95.2), (2.0, "Moderate", 88.7), (1.3, "Low-Moderate", 82.4))
+        risk_level, confidence = "Low", 96.1
+    for cutoff, level, level_confidence in cutoffs:
+        if total_score >= cutoff:
+            risk_level, confidence = level, level_confidence
+            break
+
+    scores = {
+        "social_communication": round(social_score, 2),
+        "behavioral_patterns": round(behavioral_score, 2),
+        "communication_language": round(communication_score, 2)
+    }
+    return age_group, scores, round(total_score, 2), risk_level, round(confidence, 1)
+
+@pytest.mark.parametrize("scoring", ["arithmetic", "lookup"])
+def test_score_responses_matches_original_arithmetic(scoring, tmp_path):
+    tool = AutismScreeningTool(scoring=scoring, table_cache_dir=str(tmp_path))
+    rng = np.random.default_rng(7)
+
+    for _ in range(3000):
+        responses = dict(zip(tool.indicator_order, rng.integers(0, 5, size=len(tool.indicator_order)).tolist()))
+        age_months = int(rng.integers(18, 960))
+        result = tool.score_responses(responses, age_months)
+
+        age_group, scores, total_score, risk_level, confidence = original_assessment(tool, responses, age_months)
+        assert result.age_group == age_group
+        assert result.scores == scores
+        assert result.total_score == total_score
+        assert result.risk_level == risk_level
+        assert result.confidence == confidence
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Understanding Together - Scoring mode equivalence
+Lookup-table scoring must give exactly the same batch scores as arithmetic scoring
+"""
+
+import numpy as np
+import pytest
+
+from autism_assessment import DEFAULT_INSTRUMENT, DOMAINS, AutismScreeningTool, Instrument
+
+def wide_instrument() -> Instrument:
+    """The default instrument with two extra social indicators (9 in that domain)"""
+    definition = DEFAULT_INSTRUMENT.to_dict()
+    definition["name"] = "wide-social"
+    social = definition["domains"]["social"]
+    social["shared_attention"] = {"question": "Does the person share attention with others?",
+                                  "weight": 0.65, "reverse_scored": True}
+    social["peer_interest"] = {"question": "Does the person show interest in peers?",
+                               "weight": 0.55, "reverse_scored": False}
+    return Instrument.compile(definition)
+
+@pytest.mark.parametrize("instrument", [DEFAULT_INSTRUMENT, wide_instrument()], ids=["default", "wide-social"])
+def test_lookup_matches_arithmetic(instrument, tmp_path):
+    arithmetic = AutismScreeningTool(scoring="arithmetic", instrument=instrument)
+    lookup = AutismScreeningTool(scoring="lookup", table_cache_dir=str(tmp_path), instrument=instrument)
+
+    rng = np.random.default_rng(2024)
+    responses = rng.integers(0, 5, size=(2000, len(arithmetic.indicator_order)))
+    ages = rng.integers(18, 240, size=len(responses))
+
+    expected = arithmetic.score_batch(responses, ages)
+    actual = lookup.score_batch(responses, ages)
+    for field in ("social", "behavioral", "communication", "total", "risk_codes", "confidence",
+                  "recommendation_set_ids"):
+        np.testing.assert_array_equal(getattr(actual, field), getattr(expected, field), err_msg=field)
+    np.testing.assert_array_equal(actual.age_groups, expected.age_groups)
+
+def test_wide_instrument_has_a_large_domain():
+    sizes = {domain: len(indicators) for domain, indicators in wide_instrument().to_dict()["domains"].items()}
+    assert set(sizes) == set(DOMAINS)
+    assert max(sizes.values()) >= 8